@@ -0,0 +1,146 @@
+"""In-process caching utilities for the gateway service."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+V = TypeVar("V")
+
+# Sentinel for telling a cache miss apart from a cached None
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded in-memory cache with per-entry expiration.
+
+    Entries are evicted in least-recently-used order once ``maxsize`` is
+    reached and are dropped on access after their time-to-live has passed.
+    All operations are synchronous, so they are atomic with respect to other
+    coroutines running on the same event loop and need no locking.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries to keep
+            ttl: Default time-to-live for entries in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, Tuple[float, V]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        """
+        Get a cached value if present and not expired.
+
+        Args:
+            key: Cache key
+            default: Value to return on a miss
+
+        Returns:
+            The cached value, or ``default`` if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds (defaults to the cache TTL)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Optional[V]:
+        """
+        Remove a value from the cache.
+
+        Args:
+            key: Cache key
+            default: Value to return if the key is not cached
+
+        Returns:
+            The removed value, or ``default`` if it was not cached
+        """
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight(Generic[V]):
+    """
+    Coalesce concurrent calls for the same key into a single in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task instead of starting their own.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[V]]) -> V:
+        """
+        Run ``factory`` for ``key`` unless a call for that key is in flight.
+
+        Args:
+            key: Key identifying the work
+            factory: Callable returning the awaitable that performs the work
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield the shared task so one cancelled caller does not cancel it
+        # for every other caller waiting on the same key
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -2,22 +2,242 @@
 HTTP client implementation for making requests to external services.
 """
 
-from typing import Any, Dict, Optional
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Dict, Optional, Self
+from urllib.parse import urlsplit
 
 import httpx
 
+from gateway.cache import TTLCache
+from gateway.config import get_settings
+
+try:
+    from httpx_aiohttp import AiohttpTransport
+except ImportError:  # pragma: no cover - optional dependency
+    AiohttpTransport = None
+
+# Headers sent with every request; the external services the gateway talks
+# to all respond with JSON. Accept-Encoding is left to httpx, which only
+# advertises the encodings it has decoders installed for.
+DEFAULT_HEADERS = {"Accept": "application/json"}
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_after_seconds(value: Optional[str], default: float) -> float:
+    """
+    Parse a Retry-After header into a number of seconds to wait.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+        default: Delay to use when the header is missing or malformed
+
+    Returns:
+        Seconds to wait before retrying (never negative)
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def _request_timeout(timeout: Optional[float]) -> Any:
+    """
+    Map an optional per-request timeout to what httpx expects.
+
+    None means "use the client's configured timeout"; httpx itself would
+    read None as "no timeout at all", so it is swapped for its sentinel.
+    """
+    return httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+
+
+class _HostLimiter:
+    """
+    Client-side rate limit state for a single host.
+
+    Requests draw from a token bucket refilled at ``rate`` per second (a rate
+    of zero disables it). After the host answers 429, requests to it are
+    funnelled through ``lock`` one at a time until ``blocked_until`` passes,
+    so concurrent callers do not all retry into the same throttle.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until the token bucket allows another request."""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
 
 class AsyncHTTPClient:
     """
     HTTP client implementation using httpx.AsyncClient.
+
+    A single instance is meant to be shared for the lifetime of the application
+    so that connections to the same host are kept alive and reused between
+    requests. The underlying httpx client is created lazily and can be
+    recreated after ``aclose()`` if the instance is used again.
+
+    When ``use_aiohttp`` is enabled, requests are sent through an aiohttp
+    transport (from the optional ``httpx-aiohttp`` package), which holds up
+    better than the default httpx pool under many concurrent requests. The
+    httpx API surface is unchanged either way.
     """
 
-    def __init__(self):
-        """Initialize the HTTP client."""
-        self._client = httpx.AsyncClient()
+    # Process-wide instance returned by default()
+    _default: Optional["AsyncHTTPClient"] = None
+
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        use_aiohttp: Optional[bool] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the HTTP client.
+
+        Args:
+            limits: Connection pool limits (defaults to config settings)
+            timeout: Default request timeout (defaults to config settings)
+            use_aiohttp: Whether to use the aiohttp transport (defaults to config setting)
+            headers: Default headers for every request (defaults to DEFAULT_HEADERS)
+
+        Raises:
+            ImportError: If the aiohttp transport is requested but not installed
+        """
+        settings = get_settings()
+        self._use_aiohttp = (
+            use_aiohttp
+            if use_aiohttp is not None
+            else settings.http_use_aiohttp_transport
+        )
+        if self._use_aiohttp and AiohttpTransport is None:
+            raise ImportError(
+                "The aiohttp transport requires the 'httpx-aiohttp' package; "
+                "install it with the 'aiohttp' extra"
+            )
+        self._limits = limits or httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+        self._timeout = timeout or httpx.Timeout(
+            settings.http_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds,
+            pool=settings.http_pool_timeout_seconds,
+        )
+        # HTTP/2 lets requests to the same provider share one connection; the
+        # aiohttp transport only speaks HTTP/1.1
+        self._http2 = settings.http2_enabled and not self._use_aiohttp
+        self._headers = headers if headers is not None else DEFAULT_HEADERS
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_rate = settings.http_host_requests_per_second
+        self._host_burst = settings.http_host_burst
+        self._rate_limit_retries = settings.http_rate_limit_max_retries
+        self._retry_after_default = settings.http_retry_after_default_seconds
+        self._retry_after_max = settings.http_retry_after_max_seconds
+        # Rate limit state per host. Hosts come from user-supplied sites, so
+        # the map is bounded, and an entry idle for long enough to have a full
+        # bucket and no Retry-After block left is dropped: a new limiter for
+        # that host would behave the same.
+        refill_seconds = (
+            self._host_burst / self._host_rate if self._host_rate > 0 else 0.0
+        )
+        self._limiters: TTLCache[_HostLimiter] = TTLCache(
+            maxsize=settings.http_host_limiters_maxsize,
+            ttl=self._retry_after_max + refill_seconds,
+        )
+
+    @classmethod
+    def default(cls) -> "AsyncHTTPClient":
+        """Get the process-wide HTTP client configured from settings.
+
+        The instance is created on first use and shared afterwards, so every
+        caller that does not bring its own client uses the same connection
+        pool.
+
+        Returns:
+            The shared HTTP client
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the underlying httpx client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=self._timeout,
+                headers=self._headers,
+                http2=self._http2,
+                transport=self._build_transport(),
+            )
+        return self._client
+
+    def _build_transport(self) -> Optional[httpx.AsyncBaseTransport]:
+        """Build the transport for a new httpx client.
+
+        A fresh transport is created each time because closing the httpx
+        client also closes its transport (and the aiohttp session behind it).
+
+        Returns:
+            An aiohttp transport if enabled, otherwise None for the httpx default
+        """
+        if not self._use_aiohttp:
+            return None
+        return AiohttpTransport(limits=self._limits)
+
+    async def aclose(self) -> None:
+        """Close the underlying httpx client and release pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
 
     async def get(
-        self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 10.0
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
     ) -> httpx.Response:
         """
         Make a GET request to the specified URL.
@@ -25,19 +245,25 @@ class AsyncHTTPClient:
         Args:
             url: The URL to make the request to
             headers: Optional headers to include with the request
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (defaults to the client timeout)
 
         Returns:
             HTTP response
         """
-        return await self._client.get(url, headers=headers, timeout=timeout)
+        return await self._send(
+            url,
+            lambda: self.client.get(
+                url, headers=headers, timeout=_request_timeout(timeout)
+            ),
+        )
 
     async def post(
         self,
         url: str,
         json: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: float = 10.0,
+        timeout: Optional[float] = None,
+        content: Optional[bytes] = None,
     ) -> httpx.Response:
         """
         Make a POST request to the specified URL.
@@ -46,9 +272,81 @@ class AsyncHTTPClient:
             url: The URL to make the request to
             json: JSON data to send in the request body
             headers: Optional headers to include with the request
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (defaults to the client timeout)
+            content: Pre-encoded request body (takes the place of ``json``)
 
         Returns:
             HTTP response
         """
-        return await self._client.post(url, json=json, headers=headers, timeout=timeout)
+        return await self._send(
+            url,
+            lambda: self.client.post(
+                url,
+                json=json,
+                content=content,
+                headers=headers,
+                timeout=_request_timeout(timeout),
+            ),
+        )
+
+    async def _send(
+        self, url: str, request: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        Send a request, honouring the host's rate limit and 429 responses.
+
+        A 429 response is retried after the delay from its Retry-After header
+        (capped by settings), and until that delay has passed other requests
+        to the same host are sent one at a time. Hosts get limiter state only
+        when a rate is configured or after they have answered 429.
+
+        Args:
+            url: The request URL, used to pick the host's limiter
+            request: Callable sending the request once
+
+        Returns:
+            HTTP response (the last 429 if retries are exhausted)
+        """
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None and self._host_rate > 0:
+            limiter = _HostLimiter(self._host_rate, self._host_burst)
+        if limiter is not None:
+            # Re-storing the limiter restarts its idle TTL
+            self._limiters.set(host, limiter)
+
+        attempt = 0
+        while True:
+            if limiter is None:
+                response = await request()
+            elif limiter.blocked_until > time.monotonic():
+                async with limiter.lock:
+                    delay = limiter.blocked_until - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await limiter.acquire()
+                    response = await request()
+            else:
+                await limiter.acquire()
+                response = await request()
+
+            if response.status_code != 429 or attempt >= self._rate_limit_retries:
+                return response
+
+            attempt += 1
+            delay = min(
+                _retry_after_seconds(
+                    response.headers.get("Retry-After"), self._retry_after_default
+                ),
+                self._retry_after_max,
+            )
+            if limiter is None:
+                limiter = _HostLimiter(self._host_rate, self._host_burst)
+            limiter.blocked_until = max(limiter.blocked_until, time.monotonic() + delay)
+            self._limiters.set(host, limiter)
+            logger.warning(
+                "Rate limited by %s, retrying in %.1fs (attempt %s)",
+                host,
+                delay,
+                attempt,
+            )
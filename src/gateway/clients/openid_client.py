@@ -1,9 +1,12 @@
 """OpenID client implementation."""
 
 import logging
-from typing import List
-from urllib.parse import urljoin
+from typing import List, Optional
+import httpx
+import orjson
+from pydantic import ValidationError
 
+from gateway.cache import SingleFlight, TTLCache
 from gateway.clients.http_client import AsyncHTTPClient
 from gateway.models.auth.oauth import (
     ClientRegistrationResponse,
@@ -11,27 +14,100 @@ from gateway.models.auth.oauth import (
 )
 from gateway.models.auth.openid import OpenIDConfiguration
 from gateway.exceptions import GatewayError, HTTPError, FactPodServiceError
-from gateway.config import settings
+from gateway.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Bound once at import so the hot paths skip the class attribute lookups.
+# Response bodies are validated straight from bytes, which parses the JSON
+# inside pydantic-core instead of building an intermediate dict first.
+_validate_openid_config = OpenIDConfiguration.model_validate_json
+_validate_registration = ClientRegistrationResponse.model_validate_json
+
+# Fields of every registration request that do not depend on the site,
+# dumped once so registering a client does not rebuild and walk a model
+_REGISTRATION_TEMPLATE = ClientRegistrationRequest(
+    client_name="",
+    redirect_uris=[],
+    grant_types=["authorization_code", "refresh_token"],
+    response_types=["code"],
+    token_endpoint_auth_method="client_secret_post",
+    scope="facts:read facts:make-irrelevant",
+).model_dump(mode="json", exclude={"client_name", "redirect_uris"})
+
+
+def _cache_ttl(cache_control: Optional[str], default_ttl: float) -> float:
+    """
+    Derive how long a discovery document may be cached from Cache-Control.
+
+    Args:
+        cache_control: Value of the Cache-Control response header, if any
+        default_ttl: TTL to use when the header does not restrict caching
+
+    Returns:
+        TTL in seconds (0 means the response must not be cached)
+    """
+    if not cache_control:
+        return default_ttl
+
+    ttl = default_ttl
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name in ("no-store", "no-cache"):
+            return 0
+        if name == "max-age":
+            try:
+                ttl = min(ttl, max(int(value.strip('" ')), 0))
+            except ValueError:
+                continue
+    return ttl
+
 
 class HttpOpenIDClient:
     """HTTP implementation of OpenID client."""
 
-    def __init__(self, http_client: AsyncHTTPClient) -> None:
+    def __init__(
+        self,
+        http_client: AsyncHTTPClient,
+        config_cache: Optional[TTLCache[OpenIDConfiguration]] = None,
+    ) -> None:
         """
         Initialize with HTTP client.
 
         Args:
             http_client: HTTP client implementation
+            config_cache: Cache for OpenID configurations (creates one if not provided)
         """
+        settings = get_settings()
         self.http_client = http_client
+        self.config_cache = (
+            config_cache
+            if config_cache is not None
+            else TTLCache(
+                maxsize=settings.openid_config_cache_maxsize,
+                ttl=settings.openid_config_cache_ttl_seconds,
+            )
+        )
+        # Recent transport and HTTP status failures of discovery fetches, so
+        # an unreachable site is not refetched on every enable attempt
+        self._failures: TTLCache[Exception] = TTLCache(
+            maxsize=settings.openid_config_cache_maxsize,
+            ttl=settings.openid_config_failure_ttl_seconds,
+        )
+        self._well_known_path = settings.openid_well_known_path.lstrip("/")
+        # Discovery fetches currently in flight, keyed by base URL
+        self._inflight: SingleFlight[OpenIDConfiguration] = SingleFlight()
 
     async def get_openid_config(self, site: str) -> OpenIDConfiguration:
         """
         Fetch OpenID configuration from well-known endpoint.
 
+        Parsed configurations are cached per site for the configured TTL, or
+        for less if the response's Cache-Control header asks for it. Concurrent
+        lookups for a site that is not cached share a single in-flight fetch,
+        and a fetch that failed at the HTTP level is replayed without a
+        request for a short while.
+
         Args:
             site: The site domain
 
@@ -39,34 +115,74 @@ class HttpOpenIDClient:
             OpenID configuration
 
         Raises:
+            FactPodServiceError: If the fetch failed at the HTTP level, now or
+                within the failure TTL
             GatewayError: If configuration retrieval fails
             ValueError: If configuration is missing required fields
         """
-        base_url = f"https://{site}" if "://" not in site else site
-        config_url = urljoin(base_url, settings.openid_well_known_path)
+        base_url = (f"https://{site}" if "://" not in site else site).rstrip("/")
+
+        cached_config = self.config_cache.get(base_url)
+        if cached_config is not None:
+            return cached_config
+
+        failure = self._failures.get(base_url)
+        if failure is not None:
+            raise FactPodServiceError(
+                f"Failed to fetch OpenID configuration: {str(failure)} (cached failure)"
+            ) from failure
+
+        return await self._inflight.run(
+            base_url, lambda: self._fetch_openid_config(base_url)
+        )
+
+    async def _fetch_openid_config(self, base_url: str) -> OpenIDConfiguration:
+        """
+        Fetch, validate and cache the OpenID configuration for a base URL.
+
+        Args:
+            base_url: Normalized base URL of the site
+
+        Returns:
+            OpenID configuration
+
+        Raises:
+            FactPodServiceError: If the fetch fails at the HTTP level
+            GatewayError: If configuration retrieval fails
+        """
+        config_url = f"{base_url}/{self._well_known_path}"
 
         try:
             response = await self.http_client.get(config_url)
             response.raise_for_status()
-            config_data = response.json()
-
-            required_fields = {
-                "issuer",
-                "authorization_endpoint",
-                "token_endpoint",
-                "registration_endpoint",
-                "jwks_uri",
-            }
-
-            if missing := required_fields - set(config_data):
-                raise GatewayError(
-                    f"Missing required fields in OpenID config: {missing}"
-                )
-
-            return OpenIDConfiguration(**config_data)
+            try:
+                openid_config = _validate_openid_config(response.content)
+            except ValidationError as error:
+                missing = {
+                    ".".join(str(part) for part in detail["loc"])
+                    for detail in error.errors()
+                    if detail["type"] == "missing"
+                }
+                if missing:
+                    raise GatewayError(
+                        f"Missing required fields in OpenID config: {missing}"
+                    ) from error
+                raise
+
+            self.config_cache.set(
+                base_url,
+                openid_config,
+                ttl=_cache_ttl(
+                    response.headers.get("Cache-Control"), self.config_cache.ttl
+                ),
+            )
+            return openid_config
 
-        except HTTPError as error:
+        except (HTTPError, httpx.HTTPError) as error:
             logger.error("HTTP error during OpenID configuration fetch: %s", str(error))
+            # Only transport and status failures are remembered; anything else
+            # is a bad document or a local bug and must not block the site
+            self._failures.set(base_url, error)
             raise FactPodServiceError(
                 f"Failed to fetch OpenID configuration: {str(error)}"
             ) from error
@@ -93,28 +209,27 @@ class HttpOpenIDClient:
         Raises:
             GatewayError: If registration fails
         """
-        registration_request = ClientRegistrationRequest(
-            client_name=client_name,
-            redirect_uris=redirect_uris,
-            grant_types=["authorization_code", "refresh_token"],
-            response_types=["code"],
-            token_endpoint_auth_method="client_secret_post",
-            scope="facts:read facts:make-irrelevant",
+        # Only the name and redirect URIs vary per call; the rest of the body
+        # comes from the pre-dumped template
+        body = orjson.dumps(
+            {
+                "client_name": client_name,
+                "redirect_uris": redirect_uris,
+                **_REGISTRATION_TEMPLATE,
+            }
         )
 
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+        # Accept: application/json is a client-level default header
+        headers = {"Content-Type": "application/json"}
 
         try:
             response = await self.http_client.post(
                 url=registration_endpoint,
-                json=registration_request.dict(),
+                content=body,
                 headers=headers,
             )
             response.raise_for_status()
-            return ClientRegistrationResponse(**response.json())
+            return _validate_registration(response.content)
         except HTTPError as error:
             logger.error("HTTP error during client registration: %s", str(error))
             raise FactPodServiceError from error
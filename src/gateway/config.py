@@ -4,7 +4,8 @@ This module provides centralized configuration management with environment varia
 support using Pydantic Settings.
 """
 
-from typing import Optional, List
+from functools import cached_property, lru_cache
+from typing import Optional, Tuple
 from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,6 +21,22 @@ class GatewaySettings(BaseSettings):
     db_table_name: str = "gateway-table"
     db_region_name: str = "us-east-1"
     fact_pod_config_table_name: str = "fact-pod-config-table"
+    oauth_state_table_name: str = "oauth-state-table"
+    db_item_type_index_name: str = Field(
+        default="item_type-index",
+        description="GSI on the primary table partitioned by item_type",
+    )
+    db_scan_total_segments: int = Field(
+        default=4,
+        description="Parallel scan segments used when no item_type index is configured",
+    )
+    db_max_pool_connections: int = 128
+    db_connect_timeout_seconds: float = 1.0
+    db_read_timeout_seconds: float = 3.0
+    db_retry_max_attempts: int = 10
+    categories_cache_ttl_seconds: int = 300  # 5 minutes
+    fact_pod_config_cache_ttl_seconds: int = 300  # 5 minutes
+    fact_pod_config_cache_maxsize: int = 1024
 
     # OAuth settings
     oauth_redirect_template: str = "https://{site}/oauth/callback"
@@ -28,6 +45,9 @@ class GatewaySettings(BaseSettings):
         default=".well-known/openprofile.json",
         description="Path to the OpenID configuration file",
     )
+    openid_config_cache_ttl_seconds: int = 3600  # 1 hour
+    openid_config_cache_maxsize: int = 1024
+    openid_config_failure_ttl_seconds: int = 30  # negative cache for failed fetches
 
     # Service settings
     log_level: str = Field("INFO", description="Logging level")
@@ -36,6 +56,40 @@ class GatewaySettings(BaseSettings):
         default="*", description="Comma-separated list of allowed CORS origins"
     )
 
+    # Outbound HTTP client settings
+    http_max_connections: int = 256
+    http_max_keepalive_connections: int = 64
+    http_keepalive_expiry_seconds: float = 60.0
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 3.0
+    http_pool_timeout_seconds: float = 5.0
+    http2_enabled: bool = Field(
+        default=True, description="Negotiate HTTP/2 with servers that support it"
+    )
+    http_use_aiohttp_transport: bool = Field(
+        default=False,
+        description="Send outbound requests through aiohttp (requires httpx-aiohttp)",
+    )
+    http_rate_limit_max_retries: int = Field(
+        default=2,
+        description="Retries of a request answered with 429 Too Many Requests",
+    )
+    http_retry_after_default_seconds: float = Field(
+        default=1.0, description="Wait after a 429 response without Retry-After"
+    )
+    http_retry_after_max_seconds: float = Field(
+        default=30.0, description="Upper bound on the wait requested by Retry-After"
+    )
+    http_host_requests_per_second: float = Field(
+        default=0.0, description="Outbound request rate per host (0 disables the limit)"
+    )
+    http_host_burst: int = Field(
+        default=10, description="Requests per host allowed in a burst above the rate"
+    )
+    http_host_limiters_maxsize: int = Field(
+        default=1024, description="Maximum number of hosts with rate limit state kept"
+    )
+
     # FastMCP server settings
     server_host: str = "0.0.0.0"
     server_port: int = 8080
@@ -52,13 +106,26 @@ class GatewaySettings(BaseSettings):
     )
 
     @computed_field
-    @property
-    def cors_allow_origins(self) -> List[str]:
-        """Get the CORS origins as a list."""
+    @cached_property
+    def cors_allow_origins(self) -> Tuple[str, ...]:
+        """Get the CORS origins as a tuple, parsed once on first access."""
         if self.cors_origins_str == "*":
-            return ["*"]
-        return [origin.strip() for origin in self.cors_origins_str.split(",")]
+            return ("*",)
+        return tuple(origin.strip() for origin in self.cors_origins_str.split(","))
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> GatewaySettings:
+    """Get the shared settings instance, loading it on first use.
+
+    Settings (and the .env file) are read the first time this is called
+    rather than when the module is imported.
+    """
+    return GatewaySettings()
 
 
-# Create a singleton instance of the settings
-settings = GatewaySettings()
+def __getattr__(name: str) -> GatewaySettings:
+    """Keep ``from gateway.config import settings`` working for existing callers."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,24 +1,146 @@
-from typing import Dict, Any, Optional, List
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import asyncio
 import time
+from contextlib import AsyncExitStack, aclosing
 import logging
 import aioboto3
 from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+from gateway.cache import SingleFlight, TTLCache
 from gateway.db.repository import Repository
+from gateway.db.retry import backoff_delay, is_throttled_transaction, with_backoff
 from gateway.exceptions import RepositoryError
-from gateway.config import settings
+from gateway.config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of keys DynamoDB accepts in one BatchGetItem request
+BATCH_GET_MAX_KEYS = 100
+
+# Category lookups share one condition object across calls and pages. Only
+# "name" is read; it is a reserved word, hence the placeholder. The names
+# mapping is copied per call because boto3 adds its own placeholders to it.
+_CATEGORY_CONDITION = Key("item_type").eq("category")
+_CATEGORY_PROJECTION = "#n"
+_CATEGORY_ATTRIBUTE_NAMES = {"#n": "name"}
+
+# Key prefixes and item type for user-site connection items in the primary table
+_USER_PREFIX = "USER#"
+_SITE_PREFIX = "SITE#"
+_OAUTH_CONFIG_ITEM_TYPE = "oauth_config"
+
+# One session per process, shared by every repository instance, so the
+# underlying connection pool outlives any single repository or handler
+_SESSION = aioboto3.Session()
+
+# Wire-format pieces for requests made through the low-level client
+_deserialize = TypeDeserializer().deserialize
+_serialize = TypeSerializer().serialize
+# "site" is a reserved word, so the projection goes through placeholders
+_STATE_PROJECTION = {
+    "ProjectionExpression": "#u, #s, #e",
+    "ExpressionAttributeNames": {"#u": "user_id", "#s": "site", "#e": "expires_at"},
+}
+
+
+def _deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an item in DynamoDB wire format into plain Python values."""
+    return {name: _deserialize(value) for name, value in item.items()}
+
+
+def _serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert plain Python values into an item in DynamoDB wire format."""
+    return {name: _serialize(value) for name, value in item.items()}
+
+
+def _prepare_fact_pod_config(config: Dict[str, Any]) -> None:
+    """
+    Validate a fact pod config and fill in missing timestamps in place.
+
+    Args:
+        config: Configuration dictionary (must contain 'site' key)
+
+    Raises:
+        RepositoryError: If the config has no 'site' key
+    """
+    if "site" not in config:
+        raise RepositoryError("Fact pod config must contain 'site' key")
+
+    if "updated_at" not in config:
+        config["updated_at"] = int(time.time())
+    if "created_at" not in config:
+        config["created_at"] = config["updated_at"]
+
+
+async def _paginate(
+    operation: Callable[..., Awaitable[Dict[str, Any]]], request: Dict[str, Any]
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the items of each page of a paginated query or scan.
+
+    The request for the next page is sent as soon as the current page has
+    arrived, so it is in flight while the caller processes the current one.
+
+    Args:
+        operation: Bound table method to call, such as ``table.query``
+        request: Keyword arguments for the first request
+
+    Yields:
+        Items of each page, in order.
+    """
+    response = await operation(**request)
+    next_page: Optional[asyncio.Future] = None
+    try:
+        while True:
+            next_page = None
+            if "LastEvaluatedKey" in response:
+                next_request = {
+                    **request,
+                    "ExclusiveStartKey": response["LastEvaluatedKey"],
+                }
+                next_page = asyncio.ensure_future(operation(**next_request))
+
+            yield response.get("Items", [])
+
+            if next_page is None:
+                return
+            response = await next_page
+    finally:
+        # The caller stopped early; do not leave the prefetch running
+        if next_page is not None and not next_page.done():
+            next_page.cancel()
+
 
 class DynamoDBRepository(Repository):
-    """Repository implementation using AWS DynamoDB for data storage."""
+    """Repository implementation using AWS DynamoDB for data storage.
+
+    Categories and fact pod configurations are read far more often than they
+    change, so both are cached in-process. Cache hits never wait on a lock;
+    only refills are serialized (categories) or coalesced per site (configs).
+    """
+
+    # Process-wide instance configured from settings, see default()
+    _default: Optional["DynamoDBRepository"] = None
 
     def __init__(
         self,
-        table_name: str = None,
-        region_name: str = None,
-        fact_pod_config_table_name: str = None,
+        table_name: Optional[str] = None,
+        region_name: Optional[str] = None,
+        fact_pod_config_table_name: Optional[str] = None,
+        oauth_state_table_name: Optional[str] = None,
+        max_pool_connections: Optional[int] = None,
     ):
         """Initialize the DynamoDB repository.
 
@@ -26,7 +148,10 @@ class DynamoDBRepository(Repository):
             table_name: Name of the primary DynamoDB table to use (defaults to config setting)
             region_name: AWS region where the tables are located (defaults to config setting)
             fact_pod_config_table_name: Name of the table for fact pod configs (defaults to config setting)
+            oauth_state_table_name: Name of the table for OAuth states (defaults to config setting)
+            max_pool_connections: Size of the HTTP connection pool to DynamoDB (defaults to config setting)
         """
+        settings = get_settings()
         self.table_name = (
             table_name if table_name is not None else settings.db_table_name
         )
@@ -35,14 +160,70 @@ class DynamoDBRepository(Repository):
             if fact_pod_config_table_name is not None
             else settings.fact_pod_config_table_name
         )
+        self.oauth_state_table_name = (
+            oauth_state_table_name
+            if oauth_state_table_name is not None
+            else settings.oauth_state_table_name
+        )
         self.region_name = (
             region_name if region_name is not None else settings.db_region_name
         )
-        self._session = None
+        self.item_type_index_name = settings.db_item_type_index_name
+        self.scan_total_segments = max(1, settings.db_scan_total_segments)
+        self.retry_max_attempts = settings.db_retry_max_attempts
+        self.max_pool_connections = (
+            max_pool_connections
+            if max_pool_connections is not None
+            else settings.db_max_pool_connections
+        )
+        # Keep pooled connections alive and size the pool for concurrent
+        # requests so calls do not queue for, or reconnect, a connection.
+        # Adaptive retries rate-limit the client when DynamoDB throttles it
+        # and are the only retry layer for throttled requests.
+        self._client_config = Config(
+            tcp_keepalive=True,
+            max_pool_connections=self.max_pool_connections,
+            connect_timeout=settings.db_connect_timeout_seconds,
+            read_timeout=settings.db_read_timeout_seconds,
+            retries={
+                "mode": "adaptive",
+                "max_attempts": self.retry_max_attempts,
+            },
+        )
         self._resource = None
+        self._client = None
         self._tables = {}
+        # Owns the resource and client contexts so close() exits all of them
+        self._exit_stack = AsyncExitStack()
+        # Serializes creating the resource, client and tables
+        self._connect_lock = asyncio.Lock()
+
+        # (expires_at, categories) snapshot, replaced wholesale on refill
+        self._categories_cache: Optional[Tuple[float, Tuple[str, ...]]] = None
+        self._categories_lock = asyncio.Lock()
+        self._fact_pod_config_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            maxsize=settings.fact_pod_config_cache_maxsize,
+            ttl=settings.fact_pod_config_cache_ttl_seconds,
+        )
+        self._fact_pod_config_fetches: SingleFlight[Optional[Dict[str, Any]]] = (
+            SingleFlight()
+        )
+
+    @classmethod
+    def default(cls) -> "DynamoDBRepository":
+        """Get the process-wide repository configured from settings.
+
+        The instance is created on first use and shared afterwards, so there
+        is a single session, connection pool and cache per process.
 
-    async def _get_table(self, table_name: str = None):
+        Returns:
+            The shared repository instance
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    async def _get_table(self, table_name: Optional[str] = None):
         """Get or create a DynamoDB table resource.
 
         Args:
@@ -57,85 +238,337 @@ class DynamoDBRepository(Repository):
         if table_name is None:
             table_name = self.table_name
 
-        if table_name not in self._tables:
-            try:
-                # Create a new session if one doesn't exist
-                if self._session is None:
-                    self._session = aioboto3.Session()
-
-                # Create a DynamoDB resource using the session if not already created
-                if self._resource is None:
-                    self._resource = await self._session.resource(
-                        "dynamodb", region_name=self.region_name
-                    ).__aenter__()
-
-                # Get a reference to the requested table
-                self._tables[table_name] = await self._resource.Table(table_name)
-                logger.debug(
-                    f"Connected to DynamoDB table {table_name} in {self.region_name}"
-                )
-            except Exception as error:
-                logger.error(
-                    f"Failed to connect to DynamoDB table {table_name}: {str(error)}"
-                )
-                raise RepositoryError(
-                    f"Failed to connect to DynamoDB: {str(error)}"
-                ) from error
+        table = self._tables.get(table_name)
+        if table is not None:
+            return table
+
+        # Concurrent first calls must not each create a resource
+        async with self._connect_lock:
+            # Another caller may have connected the table while we waited
+            if table_name not in self._tables:
+                try:
+                    # Create a DynamoDB resource using the session if not already created
+                    if self._resource is None:
+                        self._resource = await self._exit_stack.enter_async_context(
+                            _SESSION.resource(
+                                "dynamodb",
+                                region_name=self.region_name,
+                                config=self._client_config,
+                            )
+                        )
+
+                    # Get a reference to the requested table
+                    self._tables[table_name] = await self._resource.Table(table_name)
+                    logger.debug(
+                        "Connected to DynamoDB table %s in %s",
+                        table_name,
+                        self.region_name,
+                    )
+                except Exception as error:
+                    logger.error(
+                        "Failed to connect to DynamoDB table %s: %s", table_name, error
+                    )
+                    raise RepositoryError(
+                        f"Failed to connect to DynamoDB: {str(error)}"
+                    ) from error
+
+            return self._tables[table_name]
+
+    async def _get_client(self):
+        """Get or create the low-level DynamoDB client.
+
+        Hot read paths use the client directly, which skips the resource
+        layer's per-call request serialization and response transformation.
 
-        return self._tables[table_name]
+        Returns:
+            The DynamoDB client
+
+        Raises:
+            RepositoryError: If unable to connect to DynamoDB
+        """
+        if self._client is not None:
+            return self._client
+
+        async with self._connect_lock:
+            # Another caller may have created the client while we waited
+            if self._client is None:
+                try:
+                    self._client = await self._exit_stack.enter_async_context(
+                        _SESSION.client(
+                            "dynamodb",
+                            region_name=self.region_name,
+                            config=self._client_config,
+                        )
+                    )
+                except Exception as error:
+                    logger.error("Failed to create DynamoDB client: %s", error)
+                    raise RepositoryError(
+                        f"Failed to connect to DynamoDB: {str(error)}"
+                    ) from error
+
+            return self._client
+
+    async def warmup(self) -> None:
+        """Create the DynamoDB resource and tables ahead of the first request.
+
+        Also issues a throwaway GetItem so credential resolution and the TLS
+        handshake happen at startup instead of on a user's request. Failures
+        are logged and otherwise ignored; tables are then connected lazily.
+        """
+        try:
+            table = await self._get_table()
+            await self._get_table(self.fact_pod_config_table_name)
+            await self._get_table(self.oauth_state_table_name)
+            client = await self._get_client()
+            # The resource and the client keep separate connection pools
+            await asyncio.gather(
+                table.get_item(
+                    Key={"pk": "WARMUP", "sk": "WARMUP"}, ProjectionExpression="pk"
+                ),
+                client.get_item(
+                    TableName=self.table_name,
+                    Key={"pk": {"S": "WARMUP"}, "sk": {"S": "WARMUP"}},
+                    ProjectionExpression="pk",
+                ),
+            )
+            logger.debug("Warmed up DynamoDB connection")
+        except Exception as error:
+            logger.warning("Failed to warm up DynamoDB connection: %s", error)
 
     async def close(self):
-        """Close the DynamoDB resource connection."""
-        if self._resource:
-            try:
-                await self._resource.__aexit__(None, None, None)
-                self._resource = None
-                self._tables = {}
-                logger.debug("Closed DynamoDB resource connection")
-            except Exception as error:
-                logger.error(f"Error closing DynamoDB connection: {str(error)}")
+        """Close the DynamoDB resource and client connections.
+
+        Every context entered so far is exited in reverse order, even if one
+        of them fails to close. The repository can be used again afterwards;
+        connections are then re-created on demand.
+        """
+        exit_stack, self._exit_stack = self._exit_stack, AsyncExitStack()
+        self._resource = None
+        self._client = None
+        self._tables = {}
+        try:
+            await exit_stack.aclose()
+            logger.debug("Closed DynamoDB connections")
+        except Exception as error:
+            logger.error("Error closing DynamoDB connections: %s", error)
 
     async def get_categories(self) -> List[str]:
         """
-        Fetch all categories from the DynamoDB table.
+        Fetch all categories, served from the in-process cache when fresh.
 
         Returns:
             List of category names as strings.
 
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        cached = self._fresh_categories()
+        if cached is not None:
+            return list(cached)
+
+        async with self._categories_lock:
+            # Another caller may have refilled the cache while we waited
+            cached = self._fresh_categories()
+            if cached is not None:
+                return list(cached)
+
+            if self.item_type_index_name:
+                categories = await self._query_categories()
+            else:
+                categories = await self._scan_categories()
+            self._cache_categories(categories)
+            return categories
+
+    async def iter_categories(self) -> AsyncIterator[str]:
+        """
+        Yield all categories, streaming them page by page.
+
+        Names are yielded as soon as each page of the item_type index has
+        been read, so callers can start before the whole index is walked. A
+        fresh cached snapshot is served directly and a fully consumed stream
+        refreshes it. Without an index all scan segments finish together, so
+        the names are yielded once the scan is complete.
+
+        Yields:
+            Category names as strings.
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        cached = self._fresh_categories()
+        if cached is None and not self.item_type_index_name:
+            cached = await self.get_categories()
+        if cached is not None:
+            for name in cached:
+                yield name
+            return
+
+        categories: List[str] = []
+        # Close the pages eagerly if the caller stops early, so a prefetched
+        # page request is cancelled rather than left running
+        async with aclosing(self._query_category_pages()) as pages:
+            async for page in pages:
+                categories.extend(page)
+                for name in page:
+                    yield name
+        self._cache_categories(categories)
+
+    def _fresh_categories(self) -> Optional[Tuple[str, ...]]:
+        """Return the cached categories if they have not expired yet."""
+        cached = self._categories_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def _cache_categories(self, categories: Sequence[str]) -> None:
+        """Replace the cached categories snapshot."""
+        self._categories_cache = (
+            time.monotonic() + get_settings().categories_cache_ttl_seconds,
+            tuple(categories),
+        )
+
+    async def _query_categories(self) -> List[str]:
+        """
+        Fetch all categories from the item_type GSI of the DynamoDB table.
+
+        Returns:
+            List of category names as strings.
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        categories = [
+            name async for page in self._query_category_pages() for name in page
+        ]
+        logger.debug("Retrieved %s categories", len(categories))
+        return categories
+
+    async def _query_category_pages(self) -> AsyncIterator[List[str]]:
+        """
+        Read the item_type GSI of the DynamoDB table one page at a time.
+
+        Only category items are read and only their names are transferred.
+
+        Yields:
+            Category names from each page, in order.
+
         Raises:
             RepositoryError: If there's an error accessing DynamoDB
         """
         try:
             table = await self._get_table()
 
-            # Scan the table with a filter for item_type = 'category'
-            response = await table.scan(
-                FilterExpression=Key("item_type").eq("category")
-            )
+            # Query the item_type index for item_type = 'category'
+            query_kwargs = {
+                "IndexName": self.item_type_index_name,
+                "KeyConditionExpression": _CATEGORY_CONDITION,
+                "Select": "SPECIFIC_ATTRIBUTES",
+                "ProjectionExpression": _CATEGORY_PROJECTION,
+                "ExpressionAttributeNames": dict(_CATEGORY_ATTRIBUTE_NAMES),
+            }
+            async with aclosing(_paginate(table.query, query_kwargs)) as pages:
+                async for items in pages:
+                    yield [item["name"] for item in items]
+
+        except Exception as error:
+            logger.error("Failed to fetch categories: %s", error)
+            raise RepositoryError(
+                f"Failed to fetch categories: {str(error)}"
+            ) from error
+
+    async def _scan_categories(self) -> List[str]:
+        """
+        Fetch all categories with a parallel scan of the DynamoDB table.
+
+        Fallback for tables without an item_type index. The table is split
+        into segments which are scanned concurrently, so pages from different
+        segments are fetched in parallel instead of one round trip at a time.
 
-            # Extract category names from items
-            categories = [item["name"] for item in response.get("Items", [])]
+        Returns:
+            List of category names as strings.
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        try:
+            table = await self._get_table()
 
-            # Handle pagination if there are more results
-            while "LastEvaluatedKey" in response:
-                response = await table.scan(
-                    FilterExpression=Key("item_type").eq("category"),
-                    ExclusiveStartKey=response["LastEvaluatedKey"],
+            total_segments = self.scan_total_segments
+            segments = await asyncio.gather(
+                *(
+                    self._scan_category_segment(table, segment, total_segments)
+                    for segment in range(total_segments)
                 )
-                categories.extend([item["name"] for item in response.get("Items", [])])
+            )
+            categories = [name for segment in segments for name in segment]
 
-            logger.debug(f"Retrieved {len(categories)} categories")
+            logger.debug(
+                "Retrieved %s categories from %s segments",
+                len(categories),
+                total_segments,
+            )
             return categories
 
         except Exception as error:
-            logger.error(f"Failed to fetch categories: {str(error)}")
+            logger.error("Failed to fetch categories: %s", error)
             raise RepositoryError(
                 f"Failed to fetch categories: {str(error)}"
             ) from error
 
+    async def _scan_category_segment(
+        self, table: Any, segment: int, total_segments: int
+    ) -> List[str]:
+        """
+        Scan one segment of the table for categories, following pagination.
+
+        Args:
+            table: DynamoDB table resource
+            segment: Index of the segment to scan
+            total_segments: Total number of segments the table is split into
+
+        Returns:
+            List of category names found in the segment.
+        """
+        scan_kwargs = {
+            "FilterExpression": _CATEGORY_CONDITION,
+            "ProjectionExpression": _CATEGORY_PROJECTION,
+            "ExpressionAttributeNames": dict(_CATEGORY_ATTRIBUTE_NAMES),
+            "Segment": segment,
+            "TotalSegments": total_segments,
+        }
+        return [
+            item["name"]
+            async for items in _paginate(table.scan, scan_kwargs)
+            for item in items
+        ]
+
     async def get_fact_pod_config(self, site: str) -> Optional[Dict[str, Any]]:
         """
-        Get configuration for a fact pod site from the fact pod config DynamoDB table.
+        Get configuration for a fact pod site, served from the cache when fresh.
+
+        The returned dictionary may be shared with other callers and must not
+        be modified.
+
+        Args:
+            site: Domain of the site
+
+        Returns:
+            Configuration dictionary or None if not found
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        cached = self._fact_pod_config_cache.get(site)
+        if cached is not None:
+            return cached
+
+        return await self._fact_pod_config_fetches.run(
+            site, lambda: self._load_fact_pod_config(site)
+        )
+
+    async def _load_fact_pod_config(self, site: str) -> Optional[Dict[str, Any]]:
+        """
+        Load configuration for a fact pod site from DynamoDB and cache it.
 
         Args:
             site: Domain of the site
@@ -147,25 +580,129 @@ class DynamoDBRepository(Repository):
             RepositoryError: If there's an error accessing DynamoDB
         """
         try:
-            # Use the dedicated fact pod config table
-            table = await self._get_table(self.fact_pod_config_table_name)
+            client = await self._get_client()
 
-            # Query for the site configuration
-            response = await table.get_item(Key={"site": site})
+            # Query the dedicated fact pod config table for the site
+            response = await client.get_item(
+                TableName=self.fact_pod_config_table_name,
+                Key={"site": {"S": site}},
+            )
 
-            # Return the item if found, otherwise None
+            # Cache and return the item if found, otherwise None
             if "Item" in response:
-                return response["Item"]
+                item = _deserialize_item(response["Item"])
+                self._fact_pod_config_cache.set(site, item)
+                return item
             return None
 
         except Exception as error:
             logger.error(
-                f"Failed to get fact pod configuration for site {site}: {str(error)}"
+                "Failed to get fact pod configuration for site %s: %s", site, error
             )
             raise RepositoryError(
                 f"Failed to get fact pod configuration for site {site}: {str(error)}"
             ) from error
 
+    async def get_fact_pod_configs(
+        self, sites: Sequence[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get configurations for several fact pod sites.
+
+        Cached sites are served from memory; the rest are fetched with
+        BatchGetItem in chunks of up to 100 keys, sent concurrently. Keys that
+        DynamoDB leaves unprocessed are requested again with backoff.
+
+        Args:
+            sites: Domains of the sites
+
+        Returns:
+            Mapping of site to configuration for every site that has one
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        configs: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for site in dict.fromkeys(sites):
+            cached = self._fact_pod_config_cache.get(site)
+            if cached is not None:
+                configs[site] = cached
+            else:
+                missing.append(site)
+
+        if not missing:
+            return configs
+
+        try:
+            client = await self._get_client()
+            chunks = await asyncio.gather(
+                *(
+                    self._batch_get_fact_pod_configs(
+                        client, missing[start : start + BATCH_GET_MAX_KEYS]
+                    )
+                    for start in range(0, len(missing), BATCH_GET_MAX_KEYS)
+                )
+            )
+        except Exception as error:
+            logger.error(
+                "Failed to get fact pod configurations for %s sites: %s",
+                len(missing),
+                error,
+            )
+            raise RepositoryError(
+                f"Failed to get fact pod configurations: {str(error)}"
+            ) from error
+
+        for items in chunks:
+            for item in items:
+                self._fact_pod_config_cache.set(item["site"], item)
+                configs[item["site"]] = item
+        return configs
+
+    async def _batch_get_fact_pod_configs(
+        self, client, sites: Sequence[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch up to 100 fact pod configurations with BatchGetItem.
+
+        Args:
+            client: The DynamoDB client
+            sites: Domains of the sites
+
+        Returns:
+            Deserialized configuration items that were found
+
+        Raises:
+            RepositoryError: If keys are still unprocessed after all attempts
+        """
+        request = {
+            self.fact_pod_config_table_name: {
+                "Keys": [{"site": {"S": site}} for site in sites]
+            }
+        }
+        items: List[Dict[str, Any]] = []
+        attempt = 1
+        while True:
+            response = await client.batch_get_item(RequestItems=request)
+            items.extend(
+                _deserialize_item(item)
+                for item in response.get("Responses", {}).get(
+                    self.fact_pod_config_table_name, []
+                )
+            )
+
+            request = response.get("UnprocessedKeys")
+            if not request:
+                return items
+            if attempt >= self.retry_max_attempts:
+                raise RepositoryError(
+                    f"{len(request[self.fact_pod_config_table_name]['Keys'])} "
+                    "fact pod configurations left unprocessed"
+                )
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
     async def store_fact_pod_config(self, config: Dict[str, Any]) -> None:
         """
         Store or update configuration for a fact pod site in the fact pod config DynamoDB table.
@@ -176,33 +713,32 @@ class DynamoDBRepository(Repository):
         Raises:
             RepositoryError: If there's an error accessing DynamoDB or config is invalid
         """
-        if "site" not in config:
-            raise RepositoryError("Fact pod config must contain 'site' key")
+        _prepare_fact_pod_config(config)
 
         try:
             # Use the dedicated fact pod config table
             table = await self._get_table(self.fact_pod_config_table_name)
 
-            # Add timestamp if not present
-            if "updated_at" not in config:
-                config["updated_at"] = int(time.time())
-            if "created_at" not in config:
-                config["created_at"] = config["updated_at"]
-
             # Store the configuration
             await table.put_item(Item=config)
-            logger.debug(f"Stored fact pod config for site {config['site']}")
+            logger.debug("Stored fact pod config for site %s", config["site"])
+
+            # Write through to the cache with a copy so later changes to the
+            # caller's dict are not visible to readers
+            self._fact_pod_config_cache.set(config["site"], dict(config))
 
         except Exception as error:
             logger.error(
-                f"Failed to store fact pod config for site {config.get('site', 'unknown')}: {str(error)}"
+                "Failed to store fact pod config for site %s: %s",
+                config.get("site", "unknown"),
+                error,
             )
             raise RepositoryError(
                 f"Failed to store fact pod configuration: {str(error)}"
             ) from error
 
     async def get_user_site_connection(
-        self, user_id: str, site: str
+        self, user_id: str, site: str, fields: Optional[Sequence[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Check if a user has already enabled a site's fact pod.
@@ -210,6 +746,7 @@ class DynamoDBRepository(Repository):
         Args:
             user_id: ID of the user
             site: Domain of the site
+            fields: Attributes to return (defaults to the whole item)
 
         Returns:
             Connection details if exists, otherwise None
@@ -220,10 +757,17 @@ class DynamoDBRepository(Repository):
         try:
             table = await self._get_table()
 
+            get_kwargs = {
+                "Key": {"pk": _USER_PREFIX + user_id, "sk": _SITE_PREFIX + site}
+            }
+            if fields:
+                # Use placeholders so reserved words can be requested too
+                names = {f"#f{index}": field for index, field in enumerate(fields)}
+                get_kwargs["ProjectionExpression"] = ", ".join(names)
+                get_kwargs["ExpressionAttributeNames"] = names
+
             # Query for the user-site connection
-            response = await table.get_item(
-                Key={"pk": f"USER#{user_id}", "sk": f"SITE#{site}"}
-            )
+            response = await table.get_item(**get_kwargs)
 
             # Return the item if found, otherwise None
             if "Item" in response:
@@ -232,12 +776,52 @@ class DynamoDBRepository(Repository):
 
         except Exception as error:
             logger.error(
-                f"Failed to get user-site connection for user {user_id} and site {site}: {str(error)}"
+                "Failed to get user-site connection for user %s and site %s: %s",
+                user_id,
+                site,
+                error,
             )
             raise RepositoryError(
                 f"Failed to get user-site connection for user {user_id} and site {site}: {str(error)}"
             ) from error
 
+    async def user_site_connection_exists(self, user_id: str, site: str) -> bool:
+        """
+        Check whether a user-site connection exists without reading its details.
+
+        Only the partition key is projected, so OAuth credentials are never
+        transferred for what is just an existence check.
+
+        Args:
+            user_id: ID of the user
+            site: Domain of the site
+
+        Returns:
+            True if the connection exists
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        try:
+            table = await self._get_table()
+
+            response = await table.get_item(
+                Key={"pk": _USER_PREFIX + user_id, "sk": _SITE_PREFIX + site},
+                ProjectionExpression="pk",
+            )
+            return "Item" in response
+
+        except Exception as error:
+            logger.error(
+                "Failed to check user-site connection for user %s and site %s: %s",
+                user_id,
+                site,
+                error,
+            )
+            raise RepositoryError(
+                f"Failed to check user-site connection for user {user_id} and site {site}: {str(error)}"
+            ) from error
+
     async def store_oauth_config(
         self,
         user_id: str,
@@ -261,34 +845,181 @@ class DynamoDBRepository(Repository):
         """
         try:
             table = await self._get_table()
-
-            # Create item for user-site connection with OAuth config
-            current_time = int(time.time())
-            item = {
-                "pk": f"USER#{user_id}",
-                "sk": f"SITE#{site}",
-                "user_id": user_id,
-                "site": site,
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "redirect_url": redirect_url,
-                "created_at": current_time,
-                "updated_at": current_time,
-                "item_type": "oauth_config",
-            }
+            item = self._oauth_config_item(
+                user_id, site, client_id, client_secret, redirect_url
+            )
 
             # Store the item in DynamoDB
             await table.put_item(Item=item)
-            logger.debug(f"Stored OAuth config for user {user_id} and site {site}")
+            logger.debug("Stored OAuth config for user %s and site %s", user_id, site)
 
         except Exception as error:
             logger.error(
-                f"Failed to store OAuth configuration for user {user_id} and site {site}: {str(error)}"
+                "Failed to store OAuth configuration for user %s and site %s: %s",
+                user_id,
+                site,
+                error,
             )
             raise RepositoryError(
                 f"Failed to store OAuth configuration for user {user_id} and site {site}: {str(error)}"
             ) from error
 
+    async def store_oauth_configs(self, entries: Sequence[Dict[str, str]]) -> None:
+        """
+        Store OAuth configurations for several user-site connections at once.
+
+        The items go through the table's batch writer, which groups them
+        into BatchWriteItem requests of up to 25 items and resubmits
+        unprocessed items.
+
+        Args:
+            entries: Dicts with the user_id, site, client_id, client_secret
+                and redirect_url of each connection
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        try:
+            items = [self._oauth_config_item(**entry) for entry in entries]
+            table = await self._get_table()
+            async with table.batch_writer() as batch:
+                for item in items:
+                    await batch.put_item(Item=item)
+            logger.debug("Stored %s OAuth configs", len(items))
+
+        except Exception as error:
+            logger.error("Failed to store OAuth configurations: %s", error)
+            raise RepositoryError(
+                f"Failed to store OAuth configurations: {str(error)}"
+            ) from error
+
+    async def store_oauth_config_and_state(
+        self,
+        user_id: str,
+        site: str,
+        client_id: str,
+        client_secret: str,
+        redirect_url: str,
+        state: str,
+        fact_pod_config: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Store OAuth configuration and OAuth state in a single transaction.
+
+        Both items, plus the site's fact pod configuration when given, are
+        written with one TransactWriteItems request, so either all of them
+        are stored or none is.
+
+        Args:
+            user_id: ID of the user
+            site: Domain of the site
+            client_id: OAuth client ID
+            client_secret: OAuth client secret
+            redirect_url: OAuth redirect URL
+            state: Random state string
+            fact_pod_config: Newly discovered fact pod configuration to store
+                alongside (must contain 'site' key)
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB or the
+                fact pod config is invalid
+        """
+        if fact_pod_config is not None:
+            _prepare_fact_pod_config(fact_pod_config)
+
+        try:
+            client = await self._get_client()
+            config_item = self._oauth_config_item(
+                user_id, site, client_id, client_secret, redirect_url
+            )
+            state_item = self._oauth_state_item(state, user_id, site)
+            transact_items = [
+                {
+                    "Put": {
+                        "TableName": self.table_name,
+                        "Item": _serialize_item(config_item),
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": self.oauth_state_table_name,
+                        "Item": _serialize_item(state_item),
+                    }
+                },
+            ]
+            if fact_pod_config is not None:
+                transact_items.append(
+                    {
+                        "Put": {
+                            "TableName": self.fact_pod_config_table_name,
+                            "Item": _serialize_item(fact_pod_config),
+                        }
+                    }
+                )
+
+            # botocore does not retry a transaction cancelled because one of
+            # its items was throttled, so such cancellations are retried here
+            await with_backoff(
+                lambda: client.transact_write_items(TransactItems=transact_items),
+                retryable=is_throttled_transaction,
+                max_attempts=self.retry_max_attempts,
+            )
+            if fact_pod_config is not None:
+                self._fact_pod_config_cache.set(
+                    fact_pod_config["site"], dict(fact_pod_config)
+                )
+            logger.debug(
+                "Stored OAuth config and state for user %s and site %s",
+                user_id,
+                site,
+            )
+
+        except Exception as error:
+            logger.error(
+                "Failed to store OAuth configuration and state for user %s and site %s: %s",
+                user_id,
+                site,
+                error,
+            )
+            raise RepositoryError(
+                f"Failed to store OAuth configuration and state for user {user_id} and site {site}: {str(error)}"
+            ) from error
+
+    def _oauth_config_item(
+        self,
+        user_id: str,
+        site: str,
+        client_id: str,
+        client_secret: str,
+        redirect_url: str,
+    ) -> Dict[str, Any]:
+        """
+        Build the DynamoDB item for a user-site connection with OAuth config.
+
+        Args:
+            user_id: ID of the user
+            site: Domain of the site
+            client_id: OAuth client ID
+            client_secret: OAuth client secret
+            redirect_url: OAuth redirect URL
+
+        Returns:
+            Item to store in the primary table
+        """
+        current_time = int(time.time())
+        return {
+            "pk": _USER_PREFIX + user_id,
+            "sk": _SITE_PREFIX + site,
+            "user_id": user_id,
+            "site": site,
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "redirect_url": redirect_url,
+            "created_at": current_time,
+            "updated_at": current_time,
+            "item_type": _OAUTH_CONFIG_ITEM_TYPE,
+        }
+
     async def store_oauth_state(self, state: str, user_id: str, site: str) -> None:
         """
         Store OAuth state for CSRF protection in DynamoDB.
@@ -302,39 +1033,94 @@ class DynamoDBRepository(Repository):
             RepositoryError: If there's an error accessing DynamoDB
         """
         try:
-            table = await self._get_table()
-
-            # Calculate expiration time based on TTL setting
-            current_time = int(time.time())
-            expiration_time = current_time + settings.oauth_state_ttl_seconds
-
-            # Create item for OAuth state with TTL
-            item = {
-                "pk": f"STATE#{state}",
-                "sk": "STATE",
-                "state": state,
-                "user_id": user_id,
-                "site": site,
-                "created_at": current_time,
-                "expires_at": expiration_time,
-                "item_type": "oauth_state",
-                "ttl": expiration_time,  # DynamoDB TTL attribute
-            }
-
-            # Store the item in DynamoDB
-            await table.put_item(Item=item)
+            item = self._oauth_state_item(state, user_id, site)
+            await self._write_oauth_states([item])
             logger.debug(
-                f"Stored OAuth state {state} for user {user_id} and site {site} with TTL {expiration_time}"
+                "Stored OAuth state %s for user %s and site %s with TTL %s",
+                state,
+                user_id,
+                site,
+                item["ttl"],
             )
 
         except Exception as error:
             logger.error(
-                f"Failed to store OAuth state for user {user_id} and site {site}: {str(error)}"
+                "Failed to store OAuth state for user %s and site %s: %s",
+                user_id,
+                site,
+                error,
             )
             raise RepositoryError(
                 f"Failed to store OAuth state for user {user_id} and site {site}: {str(error)}"
             ) from error
 
+    async def store_oauth_states(self, states: Sequence[Tuple[str, str, str]]) -> None:
+        """
+        Store several OAuth states with batched writes.
+
+        Args:
+            states: (state, user_id, site) tuples to store
+
+        Raises:
+            RepositoryError: If there's an error accessing DynamoDB
+        """
+        try:
+            await self._write_oauth_states(
+                [self._oauth_state_item(*state) for state in states]
+            )
+            logger.debug("Stored %s OAuth states", len(states))
+
+        except Exception as error:
+            logger.error("Failed to store OAuth states: %s", error)
+            raise RepositoryError(
+                f"Failed to store OAuth states: {str(error)}"
+            ) from error
+
+    def _oauth_state_item(self, state: str, user_id: str, site: str) -> Dict[str, Any]:
+        """
+        Build the DynamoDB item for an OAuth state.
+
+        Args:
+            state: Random state string
+            user_id: ID of the user
+            site: Domain of the site
+
+        Returns:
+            Item to store in the OAuth state table
+        """
+        # Calculate expiration time based on TTL setting
+        current_time = int(time.time())
+        expiration_time = current_time + get_settings().oauth_state_ttl_seconds
+
+        return {
+            "state": state,
+            "user_id": user_id,
+            "site": site,
+            "created_at": current_time,
+            "expires_at": expiration_time,
+            "ttl": expiration_time,  # DynamoDB TTL attribute
+        }
+
+    async def _write_oauth_states(self, items: List[Dict[str, Any]]) -> None:
+        """
+        Write OAuth state items to the OAuth state table.
+
+        A single item is written with PutItem; several are written through
+        the table's batch writer, which chunks them into BatchWriteItem
+        requests and resubmits unprocessed items.
+
+        Args:
+            items: OAuth state items to write
+        """
+        table = await self._get_table(self.oauth_state_table_name)
+        if len(items) == 1:
+            await table.put_item(Item=items[0])
+            return
+
+        async with table.batch_writer() as batch:
+            for item in items:
+                await batch.put_item(Item=item)
+
     async def verify_oauth_state(self, state: str) -> Optional[Dict[str, Any]]:
         """
         Verify an OAuth state and return associated data if valid.
@@ -349,28 +1135,33 @@ class DynamoDBRepository(Repository):
             RepositoryError: If there's an error accessing DynamoDB
         """
         try:
-            table = await self._get_table()
-
-            # Get the state item from DynamoDB
-            response = await table.get_item(Key={"pk": f"STATE#{state}", "sk": "STATE"})
-
-            # Check if state exists and is not expired
-            if "Item" in response:
-                item = response["Item"]
-                current_time = int(time.time())
-
-                if item.get("expires_at", 0) > current_time:
-                    # State is valid, return user_id and site
-                    return {"user_id": item["user_id"], "site": item["site"]}
+            client = await self._get_client()
+
+            # Get the state item from DynamoDB; a consistent read sees a
+            # state written just before the OAuth callback arrived. Only the
+            # three attributes needed are read, straight from the wire format.
+            response = await client.get_item(
+                TableName=self.oauth_state_table_name,
+                Key={"state": {"S": state}},
+                ConsistentRead=True,
+                **_STATE_PROJECTION,
+            )
 
-                # State is expired, clean it up
-                await table.delete_item(Key={"pk": f"STATE#{state}", "sk": "STATE"})
-                logger.debug(f"Removed expired OAuth state {state}")
+            # Check if state exists and is not expired. Expired states are
+            # left for DynamoDB TTL to remove rather than deleted here.
+            item = response.get("Item")
+            if (
+                item is not None
+                and "expires_at" in item
+                and int(item["expires_at"]["N"]) > int(time.time())
+            ):
+                # State is valid, return user_id and site
+                return {"user_id": item["user_id"]["S"], "site": item["site"]["S"]}
 
             return None
 
         except Exception as error:
-            logger.error(f"Failed to verify OAuth state {state}: {str(error)}")
+            logger.error("Failed to verify OAuth state %s: %s", state, error)
             raise RepositoryError(
                 f"Failed to verify OAuth state: {str(error)}"
             ) from error
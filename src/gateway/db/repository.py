@@ -1,9 +1,19 @@
 # db/repository.py
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, Tuple
 
 
 class Repository(ABC):
+    """
+    Storage contract used by the handlers and services.
+
+    Every single-item lookup sits on a request path, so implementations must
+    serve them by key rather than by scanning: user-site connections by
+    ``(user_id, site)``, fact pod configurations by ``site`` and OAuth states
+    by ``state``. Categories are listed by item type, which should likewise be
+    backed by an index.
+    """
+
     @abstractmethod
     async def get_categories(self) -> list[str]:
         """
@@ -29,7 +39,7 @@ class Repository(ABC):
 
     @abstractmethod
     async def get_user_site_connection(
-        self, user_id: str, site: str
+        self, user_id: str, site: str, fields: Optional[Sequence[str]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Check if a user has already enabled a site's fact pod.
@@ -37,12 +47,27 @@ class Repository(ABC):
         Args:
             user_id: ID of the user
             site: Domain of the site
+            fields: Attributes to return (defaults to the whole item)
 
         Returns:
             Connection details if exists, otherwise None
         """
         pass
 
+    @abstractmethod
+    async def user_site_connection_exists(self, user_id: str, site: str) -> bool:
+        """
+        Check whether a user has enabled a site's fact pod.
+
+        Args:
+            user_id: ID of the user
+            site: Domain of the site
+
+        Returns:
+            True if the connection exists
+        """
+        pass
+
     @abstractmethod
     async def store_oauth_config(
         self,
@@ -64,6 +89,43 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def store_oauth_configs(self, entries: Sequence[Dict[str, str]]) -> None:
+        """
+        Store OAuth configurations for several user-site connections at once.
+
+        Args:
+            entries: Dicts with the user_id, site, client_id, client_secret
+                and redirect_url of each connection
+        """
+        pass
+
+    @abstractmethod
+    async def store_oauth_config_and_state(
+        self,
+        user_id: str,
+        site: str,
+        client_id: str,
+        client_secret: str,
+        redirect_url: str,
+        state: str,
+        fact_pod_config: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Atomically store OAuth configuration and OAuth state.
+
+        Args:
+            user_id: ID of the user
+            site: Domain of the site
+            client_id: OAuth client ID
+            client_secret: OAuth client secret
+            redirect_url: OAuth redirect URL
+            state: Random state string
+            fact_pod_config: Newly discovered fact pod configuration to store
+                in the same transaction, if any
+        """
+        pass
+
     @abstractmethod
     async def store_oauth_state(self, state: str, user_id: str, site: str) -> None:
         """
@@ -76,6 +138,31 @@ class Repository(ABC):
         """
         pass
 
+    @abstractmethod
+    async def store_oauth_states(self, states: Sequence[Tuple[str, str, str]]) -> None:
+        """
+        Store several OAuth states at once.
+
+        Args:
+            states: (state, user_id, site) tuples to store
+        """
+        pass
+
+    @abstractmethod
+    async def get_fact_pod_configs(
+        self, sites: Sequence[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get configurations for several fact pod sites in as few requests as possible.
+
+        Args:
+            sites: Domains of the sites
+
+        Returns:
+            Mapping of site to configuration for every site that has one
+        """
+        pass
+
     @abstractmethod
     async def store_fact_pod_config(self, config: Dict[str, Any]) -> None:
         """
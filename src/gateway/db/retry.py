@@ -0,0 +1,108 @@
+"""Retry helpers for throttled DynamoDB requests.
+
+botocore already retries throttled requests itself (adaptive retry mode), so
+these helpers are only for failures it does not retry: transactions cancelled
+because one of their items was throttled, and unprocessed batch items.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, TypeVar
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Cancellation reason codes DynamoDB reports for throttled transaction items
+_THROTTLED_CANCELLATION_CODES = frozenset(
+    {"ThrottlingError", "ProvisionedThroughputExceeded"}
+)
+
+
+def is_throttled_transaction(error: BaseException) -> bool:
+    """
+    Check whether a transaction was cancelled because an item was throttled.
+
+    botocore does not retry TransactionCanceledException, even when the
+    cancellation reason is throttling, so such transactions are retried here.
+
+    Args:
+        error: The raised exception
+
+    Returns:
+        True if the transaction was cancelled for throttling and may be retried
+    """
+    if not isinstance(error, ClientError):
+        return False
+    response = error.response
+    if response.get("Error", {}).get("Code") != "TransactionCanceledException":
+        return False
+    return any(
+        reason.get("Code") in _THROTTLED_CANCELLATION_CODES
+        for reason in response.get("CancellationReasons", ())
+    )
+
+
+def backoff_delay(attempt: int, base: float = 0.05, cap: float = 2.0) -> float:
+    """
+    Pick a full-jitter backoff delay for a retry.
+
+    Args:
+        attempt: Number of attempts made so far (1 for the first retry)
+        base: Backoff bound in seconds for the first retry
+        cap: Maximum backoff bound in seconds
+
+    Returns:
+        Random delay in seconds between zero and the exponential bound
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+async def with_backoff(
+    operation: Callable[[], Awaitable[T]],
+    *,
+    retryable: Callable[[BaseException], bool],
+    max_attempts: int = 3,
+    base: float = 0.05,
+    cap: float = 2.0,
+) -> T:
+    """
+    Run a DynamoDB operation, retrying throttled attempts with backoff.
+
+    Between attempts the caller sleeps for a random time between zero and an
+    exponentially growing bound (full jitter), so concurrent callers that were
+    throttled together do not retry in lockstep. Any error that is not
+    retryable is raised immediately.
+
+    Args:
+        operation: Callable returning the awaitable to run for each attempt
+        retryable: Predicate selecting the errors to retry
+        max_attempts: Maximum number of attempts, including the first
+        base: Backoff bound in seconds for the first retry
+        cap: Maximum backoff bound in seconds
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        ClientError: If the last attempt fails with a retryable error
+        Exception: Any other error raised by the operation
+    """
+    attempt = 1
+    while True:
+        try:
+            return await operation()
+        except ClientError as error:
+            if attempt >= max_attempts or not retryable(error):
+                raise
+            delay = backoff_delay(attempt, base, cap)
+            logger.debug(
+                "DynamoDB request throttled (attempt %s), retrying in %.3fs",
+                attempt,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -3,19 +3,30 @@ from typing import Any
 
 from fastmcp.server import FastMCP
 
-from gateway.config import settings
 from gateway.db.dynamodb_repository import DynamoDBRepository
+from gateway.db.repository import Repository
 
 
 class BaseHandler(ABC):
-    def __init__(self, mcp_instance: FastMCP) -> None:
+    def __init__(
+        self, mcp_instance: FastMCP, repository: Repository | None = None
+    ) -> None:
         # Register methods
         mcp_instance.tool(self.tool_method, name=self.__class__.__name__)
-        # Initialize repository with configuration from settings
-        self.repository = DynamoDBRepository(
-            table_name=settings.db_table_name, region_name=settings.db_region_name
+        # Use the repository if one is provided, otherwise the process-wide
+        # one configured from settings
+        self.repository = (
+            repository if repository is not None else DynamoDBRepository.default()
         )
 
+    async def warmup(self) -> None:
+        """
+        Perform asynchronous startup work before the server accepts requests.
+
+        Called concurrently for all handlers from the application lifespan.
+        Does nothing by default.
+        """
+
     @abstractmethod
     async def tool_method(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
         """
@@ -7,6 +7,7 @@ from gateway.services.fact_pod_service import FactPodOAuthService
 from gateway.clients.openid_client import HttpOpenIDClient
 from gateway.handlers.base_handler import BaseHandler
 from gateway.clients.http_client import AsyncHTTPClient
+from gateway.db.repository import Repository
 from gateway.exceptions import (
     GatewayError,
     FactPodServiceError,
@@ -16,18 +17,32 @@ from gateway.exceptions import (
 logger = logging.getLogger(__name__)
 
 
+def _error_response(message: str) -> Dict[str, Any]:
+    """Build the tool response for a failed request."""
+    return {"status": "error", "message": message, "auth_url": None}
+
+
 class EnableFactPodHandler(BaseHandler):
-    def __init__(self, mcp_instance: FastMCP):
+    def __init__(
+        self,
+        mcp_instance: FastMCP,
+        repository: Repository | None = None,
+        http_client: AsyncHTTPClient | None = None,
+    ):
         """
         Initialize the handler with the MCP instance.
 
         Args:
             mcp_instance: The FastMCP instance to use for registration
+            repository: Shared repository (uses the process-wide one if not provided)
+            http_client: Shared HTTP client (uses the process-wide one if not provided)
         """
-        super().__init__(mcp_instance)
+        super().__init__(mcp_instance, repository=repository)
         # Initialize dependencies
         self.fact_pod_service = FactPodOAuthService(
-            openid_client=HttpOpenIDClient(AsyncHTTPClient()),
+            openid_client=HttpOpenIDClient(
+                http_client if http_client is not None else AsyncHTTPClient.default()
+            ),
             repository=self.repository,
         )
 
@@ -46,18 +61,10 @@ class EnableFactPodHandler(BaseHandler):
             return await self.fact_pod_service.enable_fact_pod(site, user_id)
         except FactPodServiceError as e:
             logger.error(f"Fact Pod service error: {str(e)}")
-            return {
-                "status": "error",
-                "message": f"Service error: {str(e)}",
-                "auth_url": None,
-            }
+            return _error_response(f"Service error: {str(e)}")
         except RepositoryError as e:
             logger.error(f"Repository error: {str(e)}")
-            return {
-                "status": "error",
-                "message": f"Database error: {str(e)}",
-                "auth_url": None,
-            }
+            return _error_response(f"Database error: {str(e)}")
         except GatewayError as e:
             logger.error(f"Gateway error: {str(e)}")
             error_message = str(e)
@@ -70,17 +77,9 @@ class EnableFactPodHandler(BaseHandler):
                     "auth_url": None,
                 }
 
-            return {
-                "status": "error",
-                "message": f"Gateway error: {str(e)}",
-                "auth_url": None,
-            }
+            return _error_response(f"Gateway error: {str(e)}")
         except Exception as e:
             logger.error(
                 f"Unexpected error in EnableFactPodHandler: {str(e)}", exc_info=True
             )
-            return {
-                "status": "error",
-                "message": f"An unexpected error occurred: {str(e)}",
-                "auth_url": None,
-            }
+            return _error_response(f"An unexpected error occurred: {str(e)}")
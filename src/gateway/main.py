@@ -1,37 +1,109 @@
+import asyncio
 import logging
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Callable, List, Sequence
 
 from fastmcp.server import FastMCP
 
-from gateway.config import settings
+from gateway.clients.http_client import AsyncHTTPClient
+from gateway.config import get_settings
+from gateway.db.dynamodb_repository import DynamoDBRepository
+from gateway.handlers.base_handler import BaseHandler
 from gateway.handlers.disable_fact_pod_handler import DisableFactPodHandler
 from gateway.handlers.enable_fact_pod_handler import EnableFactPodHandler
 from gateway.handlers.facts_by_category_handler import FactsByCategoryHandler
 from gateway.handlers.list_of_categories_handler import ListOfCategoriesHandler
 
 
-def create_application(mcp_instance: FastMCP = None) -> FastMCP:
+def build_lifespan(
+    http_client: AsyncHTTPClient,
+    repository: DynamoDBRepository | None = None,
+    handlers: Sequence[BaseHandler] = (),
+) -> Callable[[FastMCP], AbstractAsyncContextManager[None]]:
+    """Build a FastMCP lifespan that manages shared resources.
+
+    On startup the repository connection and the handlers' warmup hooks run
+    concurrently; on shutdown the shared resources are released, each one
+    even if releasing another fails.
+
+    Args:
+        http_client: Shared HTTP client to close when the server stops
+        repository: Shared repository to warm up and close with the server
+        handlers: Handlers to warm up when the server starts
+
+    Returns:
+        Lifespan context manager factory accepted by FastMCP
+    """
+
+    @asynccontextmanager
+    async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+        warmups = [handler.warmup() for handler in handlers]
+        if repository is not None:
+            warmups.append(repository.warmup())
+        await asyncio.gather(*warmups)
+        # Callbacks run in reverse order: the HTTP client is closed first
+        async with AsyncExitStack() as exit_stack:
+            if repository is not None:
+                exit_stack.push_async_callback(repository.close)
+            exit_stack.push_async_callback(http_client.aclose)
+            yield
+
+    return lifespan
+
+
+def create_application(
+    mcp_instance: FastMCP = None,
+    http_client: AsyncHTTPClient = None,
+    repository: DynamoDBRepository = None,
+) -> FastMCP:
     """Create and configure the FastMCP application.
 
     Args:
         mcp_instance: Optional FastMCP instance (creates one if not provided)
+        http_client: Optional shared HTTP client (uses the process-wide one if not provided)
+        repository: Optional shared repository (uses the process-wide one if not provided)
 
     Returns:
         Configured FastMCP instance with all handlers registered
     """
+    # A single HTTP client is shared by all handlers so outbound connections
+    # are pooled and kept alive for the lifetime of the application
+    http_client = http_client if http_client is not None else AsyncHTTPClient.default()
+
+    # Likewise a single repository is shared so all handlers use one DynamoDB
+    # session, connection pool and table cache
+    repository = repository if repository is not None else DynamoDBRepository.default()
+
+    # Filled in below; the lifespan only reads it once the server starts
+    handlers: List[BaseHandler] = []
+
     # Create a new instance if none is provided, or use the provided one
     # This pattern is primarily useful for testing, where a test-specific
-    # instance can be passed in
-    mcp = mcp_instance if mcp_instance is not None else FastMCP("OpenProfile.AI")
+    # instance can be passed in (its owner is then responsible for cleanup)
+    mcp = (
+        mcp_instance
+        if mcp_instance is not None
+        else FastMCP(
+            "OpenProfile.AI",
+            lifespan=build_lifespan(http_client, repository, handlers),
+        )
+    )
 
     # Initialize and register all handlers
-    EnableFactPodHandler(mcp)
-    DisableFactPodHandler(mcp)
-    ListOfCategoriesHandler(mcp)
-    FactsByCategoryHandler(mcp)
+    handlers.extend(
+        [
+            EnableFactPodHandler(mcp, repository=repository, http_client=http_client),
+            DisableFactPodHandler(mcp, repository=repository),
+            ListOfCategoriesHandler(mcp, repository=repository),
+            FactsByCategoryHandler(mcp, repository=repository),
+        ]
+    )
 
     return mcp
 
 
+settings = get_settings()
+
 # Configure logging based on settings
 logging.basicConfig(
     level=getattr(logging, settings.log_level),
@@ -1,17 +1,18 @@
 """Service layer for Fact Pod operations."""
 
+import asyncio
 import logging
-import uuid
+import secrets
 import time
-from typing import Any, Dict, List
-
-from mcp.client import auth
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
 
 from gateway.clients.openid_client import HttpOpenIDClient
 from gateway.db.repository import Repository
 from gateway.models.auth.oauth import ClientRegistrationResponse
 from gateway.models.auth.openid import OpenIDConfiguration
-from gateway.config import settings
+from gateway.config import get_settings
 from gateway.exceptions import (
     FactPodServiceError,
     GatewayError,
@@ -22,6 +23,20 @@ from gateway.exceptions import (
 logger = logging.getLogger(__name__)
 
 
+# Authorization request parameters that are the same for every site and user,
+# encoded once at import
+_AUTH_URL_CONSTANT_QUERY = urlencode(
+    {"response_type": "code", "scope": "facts:read facts:make-irrelevant"},
+    quote_via=quote,
+)
+
+
+@lru_cache(maxsize=1024)
+def _build_redirect_uri(template: str, site: str) -> str:
+    """Format the redirect URI for a site, memoized for repeat enables."""
+    return template.format(site=site)
+
+
 class FactPodOAuthService:
     """Service for handling Fact Pod OAuth operations."""
 
@@ -34,8 +49,9 @@ class FactPodOAuthService:
         """Initialize with dependencies."""
         self.openid_client = openid_client
         self.repository = repository
-        self.base_redirect_uri = base_redirect_uri or settings.oauth_redirect_template
-        self.mcp_auth = auth
+        self.base_redirect_uri = (
+            base_redirect_uri or get_settings().oauth_redirect_template
+        )
 
     async def enable_fact_pod(self, user_id: str, site: str) -> Dict[str, Any]:
         """Enable Fact Pod for the user.
@@ -52,68 +68,71 @@ class FactPodOAuthService:
             HTTPError: If OpenID configuration retrieval fails
             HTTPError: If client registration fails
         """
-        already_enabled = await self._validate_fact_pod_config(site, user_id)
-
-        if already_enabled:
-            # User already has this fact pod enabled, return success without proceeding
-            return {
-                "status": "enabled",
-                "message": "Fact Pod was already enabled for this site",
-                "auth_url": None,
-            }
-
         try:
-            # Check if we already have a configuration for this site
-            existing_config = await self.repository.get_fact_pod_config(site)
+            already_enabled, existing_config = await self._validate_fact_pod_config(
+                site, user_id
+            )
+
+            if already_enabled:
+                # User already has this fact pod enabled, return success without proceeding
+                return {
+                    "status": "enabled",
+                    "message": "Fact Pod was already enabled for this site",
+                    "auth_url": None,
+                }
 
             # Prepare redirect URIs
-            redirect_uris = [self.base_redirect_uri.format(site=site)]
-            redirect_uri = redirect_uris[0]
+            redirect_uri = _build_redirect_uri(self.base_redirect_uri, site)
+            redirect_uris = [redirect_uri]
 
-            # Get or fetch OpenID configuration
+            # Get or fetch OpenID configuration; a newly fetched one is stored
+            # together with the OAuth config and state below
+            new_config = None
             if existing_config:
                 # Use existing configuration from the database
-                logger.info(f"Using existing fact pod configuration for site {site}")
-                openid_config = OpenIDConfiguration(**existing_config["openid_config"])
+                logger.info("Using existing fact pod configuration for site %s", site)
+                openid_config = OpenIDConfiguration.model_validate(
+                    existing_config["openid_config"]
+                )
             else:
                 # Fetch configuration from the site
-                logger.info(f"Fetching new fact pod configuration for site {site}")
+                logger.info("Fetching new fact pod configuration for site %s", site)
                 openid_config = await self.openid_client.get_openid_config(site)
 
-                # Store the OpenID configuration in the database for future use
-                config_dict = {
+                # Keep the OpenID configuration in the database for future use
+                now = int(time.time())
+                new_config = {
                     "site": site,
                     "enabled": True,
                     "openid_config": openid_config.model_dump(),
-                    "created_at": int(time.time()),
-                    "updated_at": int(time.time()),
+                    "created_at": now,
+                    "updated_at": now,
                 }
-                await self.repository.store_fact_pod_config(config_dict)
-                logger.info(f"Stored fact pod configuration for site {site}")
 
             # Register client with the site - done regardless of where the config came from
             registration = await self._register_client(
                 openid_config, site, redirect_uris
             )
 
-            # Store OAuth config
-            await self.repository.store_oauth_config(
+            # Generate state and auth URL
+            # 24 random bytes, URL-safe so it needs no further encoding
+            state = secrets.token_urlsafe(24)
+            auth_url = await self._generate_auth_url(
+                openid_config, registration, state, redirect_uri
+            )
+
+            # Store the OAuth config, the state for CSRF protection and any new
+            # fact pod configuration in one transaction
+            await self.repository.store_oauth_config_and_state(
                 user_id=user_id,
                 site=site,
                 client_id=registration.client_id,
                 client_secret=registration.client_secret,
                 redirect_url=redirect_uri,
+                state=state,
+                fact_pod_config=new_config,
             )
 
-            # Generate state and auth URL
-            state = str(uuid.uuid4())
-            auth_url = await self._generate_auth_url(
-                openid_config, registration, state, redirect_uri
-            )
-
-            # Store the OAuth state for CSRF protection
-            await self.repository.store_oauth_state(state, user_id, site)
-
             # Return a simplified response format according to the documented interface
             return {
                 "status": "enabled",
@@ -125,33 +144,70 @@ class FactPodOAuthService:
             # Re-raise known errors
             raise
         except Exception as error:
-            logger.error("Error enabling Fact Pod: %s", str(error), exc_info=True)
+            logger.error("Error enabling Fact Pod: %s", error, exc_info=True)
             raise FactPodServiceError(
                 f"Failed to enable Fact Pod: {str(error)}"
             ) from error
 
-    async def _validate_fact_pod_config(self, site: str, user_id: str) -> bool:
+    async def enable_many(self, user_id: str, sites: List[str]) -> List[Dict[str, Any]]:
+        """Enable Fact Pods for one user on several sites concurrently.
+
+        Each site goes through enable_fact_pod independently, so discovery,
+        client registration and storage for all sites overlap. A failure for
+        one site does not affect the others.
+
+        Args:
+            user_id: ID of the user
+            sites: Domains of the sites
+
+        Returns:
+            One result per site, in the order given; failed sites get a dict
+            with status "error" and the error message
+        """
+        results = await asyncio.gather(
+            *(self.enable_fact_pod(user_id, site) for site in sites),
+            return_exceptions=True,
+        )
+
+        responses = []
+        for site, result in zip(sites, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                logger.error("Failed to enable Fact Pod for site %s: %s", site, result)
+                result = {"status": "error", "message": str(result), "auth_url": None}
+            responses.append(result)
+        return responses
+
+    async def _validate_fact_pod_config(
+        self, site: str, user_id: str
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """Validate if Fact Pod can be enabled for the user and site.
 
+        The connection check and the site's stored configuration are
+        independent reads, so both are fetched concurrently.
+
         Args:
             site: Domain of the site
             user_id: ID of the user
 
         Returns:
-            Boolean indicating if user already has connection to the site
+            Tuple of whether the user already has a connection to the site
+            and the site's stored fact pod configuration, if any
 
         Raises:
             RepositoryError: If repository operations fail
         """
-        # Check if the user has already enabled this site's Fact Pod
-        user_site_connection = await self.repository.get_user_site_connection(
-            user_id, site
+        already_enabled, existing_config = await asyncio.gather(
+            self.repository.user_site_connection_exists(user_id, site),
+            self.repository.get_fact_pod_config(site),
         )
-        if user_site_connection:
-            logger.info(f"User {user_id} already has connection to {site}")
-            return True
 
-        return False
+        # Check if the user has already enabled this site's Fact Pod
+        if already_enabled:
+            logger.info("User %s already has connection to %s", user_id, site)
+
+        return already_enabled, existing_config
 
     async def _register_client(
         self, openid_config: OpenIDConfiguration, site: str, redirect_uris: List[str]
@@ -173,7 +229,7 @@ class FactPodOAuthService:
                 client_name=f"Gateway for {site}",
             )
         except Exception as error:
-            logger.error("Failed to register client: %s", str(error))
+            logger.error("Failed to register client: %s", error)
             raise FactPodServiceError(
                 f"Failed to register client for {site}: {str(error)}"
             ) from error
@@ -197,24 +253,24 @@ class FactPodOAuthService:
             Authorization URL
         """
         try:
-            # Build query parameters
-            query_params = {
-                "client_id": registration.client_id,
-                "response_type": "code",
-                "scope": "facts:read facts:make-irrelevant",
-                "redirect_uri": redirect_uri,
-                "state": state,
-            }
-
-            # Format query string
-            query_string = "&".join(
-                f"{key}={value}" for key, value in query_params.items()
+            # Percent-encode the per-request values; redirect URIs carry their
+            # own query
+            query_string = urlencode(
+                {
+                    "client_id": registration.client_id,
+                    "redirect_uri": redirect_uri,
+                    "state": state,
+                },
+                quote_via=quote,
             )
 
             # Return complete URL
-            return f"{openid_config.authorization_endpoint}?{query_string}"
+            return (
+                f"{openid_config.authorization_endpoint}"
+                f"?{_AUTH_URL_CONSTANT_QUERY}&{query_string}"
+            )
         except Exception as error:
-            logger.error("Failed to generate auth URL: %s", str(error))
+            logger.error("Failed to generate auth URL: %s", error)
             raise FactPodServiceError(
                 f"Failed to generate authorization URL: {str(error)}"
             ) from error
@@ -0,0 +1,253 @@
+"""Tests for the AsyncHTTPClient implementation."""
+
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from gateway.clients.http_client import (
+    AsyncHTTPClient,
+    _HostLimiter,
+    _retry_after_seconds,
+)
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused_between_requests():
+    """Test that the same httpx client is returned until it is closed."""
+    http_client = AsyncHTTPClient()
+
+    first = http_client.client
+    second = http_client.client
+
+    assert first is second
+    await http_client.aclose()
+
+
+def test_default_returns_shared_instance():
+    """Test that default() creates the client once and reuses it."""
+    with patch.object(AsyncHTTPClient, "_default", None):
+        first = AsyncHTTPClient.default()
+        second = AsyncHTTPClient.default()
+
+    assert first is second
+    assert isinstance(first, AsyncHTTPClient)
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_underlying_client():
+    """Test that aclose closes the httpx client and allows recreation."""
+    http_client = AsyncHTTPClient()
+    first = http_client.client
+
+    await http_client.aclose()
+
+    assert first.is_closed
+    assert http_client.client is not first
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_context_manager_closes_client():
+    """Test that leaving the async context closes the httpx client."""
+    async with AsyncHTTPClient() as http_client:
+        inner = http_client.client
+
+    assert inner.is_closed
+
+
+@pytest.mark.asyncio
+async def test_custom_limits_are_applied():
+    """Test that connection pool limits can be overridden."""
+    limits = httpx.Limits(max_connections=5, max_keepalive_connections=2)
+    http_client = AsyncHTTPClient(limits=limits)
+
+    pool = http_client.client._transport._pool
+
+    assert pool._max_connections == 5
+    assert pool._max_keepalive_connections == 2
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_default_transport_is_httpx():
+    """Test that the httpx transport is used unless aiohttp is enabled."""
+    http_client = AsyncHTTPClient(use_aiohttp=False)
+
+    assert isinstance(http_client.client._transport, httpx.AsyncHTTPTransport)
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_transport_is_recreated_after_close():
+    """Test that enabling aiohttp builds a fresh transport for each client."""
+    httpx_aiohttp = pytest.importorskip("httpx_aiohttp")
+    http_client = AsyncHTTPClient(use_aiohttp=True)
+    first = http_client.client._transport
+
+    await http_client.aclose()
+    second = http_client.client._transport
+
+    assert isinstance(first, httpx_aiohttp.AiohttpTransport)
+    assert isinstance(second, httpx_aiohttp.AiohttpTransport)
+    assert first is not second
+    await http_client.aclose()
+
+
+def test_aiohttp_transport_missing_dependency():
+    """Test that requesting aiohttp without the package fails clearly."""
+    with patch("gateway.clients.http_client.AiohttpTransport", None):
+        with pytest.raises(ImportError) as excinfo:
+            AsyncHTTPClient(use_aiohttp=True)
+
+    assert "httpx-aiohttp" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_default_headers_are_applied():
+    """Test that JSON is requested by default on every request."""
+    http_client = AsyncHTTPClient()
+
+    assert http_client.client.headers["Accept"] == "application/json"
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http2_is_enabled_by_default():
+    """Test that the default transport negotiates HTTP/2."""
+    http_client = AsyncHTTPClient(use_aiohttp=False)
+
+    assert http_client.client._transport._pool._http2 is True
+    await http_client.aclose()
+
+
+def make_rate_limited_client(statuses, headers=None):
+    """Create a client whose transport answers with the given status codes."""
+    requests = []
+    responses = iter(statuses)
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(next(responses), headers=headers or {}, json={})
+
+    http_client = AsyncHTTPClient(use_aiohttp=False)
+    http_client._build_transport = lambda: httpx.MockTransport(handler)
+    return http_client, requests
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_is_retried():
+    """Test that a 429 response is retried after its Retry-After delay."""
+    http_client, requests = make_rate_limited_client(
+        [429, 200], headers={"Retry-After": "0"}
+    )
+
+    response = await http_client.get("https://example.com/resource")
+
+    assert response.status_code == 200
+    assert len(requests) == 2
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_gives_up_after_retries():
+    """Test that the last 429 is returned once retries are exhausted."""
+    http_client, requests = make_rate_limited_client(
+        [429, 429, 429, 200], headers={"Retry-After": "0"}
+    )
+    http_client._rate_limit_retries = 2
+
+    response = await http_client.post("https://example.com/resource", json={})
+
+    assert response.status_code == 429
+    assert len(requests) == 3
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unlimited_hosts_keep_no_limiter_state():
+    """Test that hosts get no limiter without a rate limit or a 429."""
+    http_client, _ = make_rate_limited_client([200, 200])
+    http_client._host_rate = 0
+
+    await http_client.get("https://a.example.com/resource")
+    await http_client.get("https://b.example.com/resource")
+
+    assert len(http_client._limiters) == 0
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_host_keeps_limiter_state():
+    """Test that a host answering 429 gets a limiter remembering the block."""
+    http_client, _ = make_rate_limited_client([429, 200], headers={"Retry-After": "0"})
+    http_client._host_rate = 0
+
+    await http_client.get("https://example.com/resource")
+
+    assert "example.com" in http_client._limiters
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_host_limiters_are_bounded():
+    """Test that limiter state is kept for at most the configured hosts."""
+    http_client, _ = make_rate_limited_client([200] * 3)
+    http_client._host_rate = 100
+    http_client._limiters.maxsize = 2
+
+    for host in ("a", "b", "c"):
+        await http_client.get(f"https://{host}.example.com/resource")
+
+    assert len(http_client._limiters) == 2
+    assert "a.example.com" not in http_client._limiters
+    await http_client.aclose()
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, 1.5),
+        ("2", 2.0),
+        ("-3", 0.0),
+        ("soon", 1.5),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ],
+)
+def test_retry_after_seconds(value, expected):
+    """Test parsing of Retry-After delay-seconds and HTTP dates."""
+    assert _retry_after_seconds(value, 1.5) == expected
+
+
+@pytest.mark.asyncio
+async def test_host_limiter_spaces_requests_beyond_burst():
+    """Test that the token bucket delays requests once the burst is spent."""
+    limiter = _HostLimiter(rate=100, capacity=1)
+
+    await limiter.acquire()
+    started = time.monotonic()
+    await limiter.acquire()
+
+    assert time.monotonic() - started >= 0.005
+
+
+@pytest.mark.asyncio
+async def test_requests_use_client_timeout_by_default():
+    """Test that requests without a timeout use the configured client timeout."""
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200, json={})
+
+    timeout = httpx.Timeout(7.0, connect=2.0)
+    http_client = AsyncHTTPClient(use_aiohttp=False, timeout=timeout)
+    http_client._build_transport = lambda: httpx.MockTransport(handler)
+
+    await http_client.get("https://example.com/resource")
+    await http_client.get("https://example.com/resource", timeout=1.0)
+
+    assert timeouts[0] == timeout.as_dict()
+    assert timeouts[1]["read"] == 1.0
+    await http_client.aclose()
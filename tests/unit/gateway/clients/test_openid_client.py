@@ -0,0 +1,263 @@
+"""Tests for the HttpOpenIDClient implementation."""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from gateway.clients.http_client import AsyncHTTPClient
+from gateway.clients.openid_client import HttpOpenIDClient, _cache_ttl
+from gateway.exceptions import FactPodServiceError, GatewayError
+from gateway.models.auth.openid import OpenIDConfiguration
+
+
+OPENID_CONFIG_DATA = {
+    "issuer": "https://example.com",
+    "authorization_endpoint": "https://example.com/oauth/authorize",
+    "token_endpoint": "https://example.com/oauth/token",
+    "registration_endpoint": "https://example.com/oauth/register",
+    "jwks_uri": "https://example.com/oauth/jwks",
+}
+
+
+def make_response(json_data, headers=None):
+    """Create a mock httpx response."""
+    response = MagicMock()
+    response.content = orjson.dumps(json_data)
+    response.headers = headers or {}
+    response.raise_for_status = MagicMock()
+    return response
+
+
+@pytest.fixture
+def mock_http_client():
+    """Create a mock HTTP client returning a valid OpenID configuration."""
+    client = MagicMock(spec=AsyncHTTPClient)
+    client.get = AsyncMock(return_value=make_response(OPENID_CONFIG_DATA))
+    return client
+
+
+@pytest.fixture
+def openid_client(mock_http_client):
+    """Create an HttpOpenIDClient for testing."""
+    return HttpOpenIDClient(mock_http_client)
+
+
+@pytest.mark.asyncio
+async def test_get_openid_config(openid_client, mock_http_client):
+    """Test fetching the OpenID configuration from the well-known endpoint."""
+    config = await openid_client.get_openid_config("example.com")
+
+    assert isinstance(config, OpenIDConfiguration)
+    assert config.issuer == "https://example.com"
+    mock_http_client.get.assert_called_once_with(
+        "https://example.com/.well-known/openprofile.json"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_openid_config_missing_fields(openid_client, mock_http_client):
+    """Test that a configuration without required fields is rejected."""
+    mock_http_client.get.return_value = make_response({"issuer": "https://example.com"})
+
+    with pytest.raises(GatewayError) as excinfo:
+        await openid_client.get_openid_config("example.com")
+
+    assert "Missing required fields" in str(excinfo.value)
+    assert "jwks_uri" in str(excinfo.value)
+    assert "issuer" not in str(excinfo.value).split("{")[1]
+
+
+@pytest.mark.asyncio
+async def test_get_openid_config_invalid_json(openid_client, mock_http_client):
+    """Test that a body that is not JSON is rejected."""
+    response = make_response({})
+    response.content = b"<html>not json</html>"
+    mock_http_client.get.return_value = response
+
+    with pytest.raises(GatewayError) as excinfo:
+        await openid_client.get_openid_config("example.com")
+
+    assert "Failed to fetch OpenID configuration" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_get_openid_config_is_cached(openid_client, mock_http_client):
+    """Test that repeated lookups for a site are served from the cache."""
+    first = await openid_client.get_openid_config("example.com")
+    second = await openid_client.get_openid_config("example.com")
+
+    assert first is second
+    mock_http_client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_openid_config_no_store(openid_client, mock_http_client):
+    """Test that responses marked no-store are not cached."""
+    mock_http_client.get.return_value = make_response(
+        OPENID_CONFIG_DATA, headers={"Cache-Control": "no-store"}
+    )
+
+    await openid_client.get_openid_config("example.com")
+    await openid_client.get_openid_config("example.com")
+
+    assert mock_http_client.get.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "cache_control, expected",
+    [
+        (None, 3600),
+        ("public", 3600),
+        ("public, max-age=300", 300),
+        ("max-age=86400", 3600),
+        ("max-age=invalid", 3600),
+        ("no-store", 0),
+        ("private, no-cache", 0),
+    ],
+)
+def test_cache_ttl(cache_control, expected):
+    """Test deriving the cache TTL from the Cache-Control header."""
+    assert _cache_ttl(cache_control, 3600) == expected
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_fetch(openid_client, mock_http_client):
+    """Test that concurrent lookups for one site issue a single request."""
+    release = asyncio.Event()
+
+    async def slow_get(url):
+        await release.wait()
+        return make_response(OPENID_CONFIG_DATA)
+
+    mock_http_client.get.side_effect = slow_get
+
+    lookups = [
+        asyncio.create_task(openid_client.get_openid_config("example.com"))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    configs = await asyncio.gather(*lookups)
+
+    assert all(config is configs[0] for config in configs)
+    mock_http_client.get.assert_called_once()
+    assert len(openid_client._inflight) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_failure(openid_client, mock_http_client):
+    """Test that a failed shared fetch is reported to every waiter and not cached."""
+    mock_http_client.get.side_effect = Exception("Connection refused")
+
+    results = await asyncio.gather(
+        openid_client.get_openid_config("example.com"),
+        openid_client.get_openid_config("example.com"),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, GatewayError) for result in results)
+    mock_http_client.get.assert_called_once()
+    assert "https://example.com" not in openid_client.config_cache
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_negative_cached(openid_client, mock_http_client):
+    """Test that a transport failure is replayed without another request."""
+    mock_http_client.get.side_effect = httpx.ConnectError("Connection refused")
+
+    with pytest.raises(FactPodServiceError):
+        await openid_client.get_openid_config("example.com")
+    with pytest.raises(FactPodServiceError) as excinfo:
+        await openid_client.get_openid_config("example.com")
+
+    assert "Connection refused" in str(excinfo.value)
+    assert "(cached failure)" in str(excinfo.value)
+    assert isinstance(excinfo.value.__cause__, httpx.ConnectError)
+    mock_http_client.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_unexpected_failure_is_not_negative_cached(
+    openid_client, mock_http_client
+):
+    """Test that failures other than HTTP errors do not block the site."""
+    mock_http_client.get.side_effect = [
+        ValueError("unexpected"),
+        make_response(OPENID_CONFIG_DATA),
+    ]
+
+    with pytest.raises(GatewayError):
+        await openid_client.get_openid_config("example.com")
+    config = await openid_client.get_openid_config("example.com")
+
+    assert config.issuer == "https://example.com"
+    assert mock_http_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_retried_after_failure_ttl(
+    openid_client, mock_http_client
+):
+    """Test that a site is fetched again once its failure has expired."""
+    mock_http_client.get.side_effect = [
+        httpx.ConnectError("Connection refused"),
+        make_response(OPENID_CONFIG_DATA),
+    ]
+
+    with pytest.raises(FactPodServiceError):
+        await openid_client.get_openid_config("example.com")
+    openid_client._failures.clear()
+    config = await openid_client.get_openid_config("example.com")
+
+    assert config.issuer == "https://example.com"
+    assert mock_http_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_register_client(openid_client, mock_http_client):
+    """Test that client registration posts a JSON body and parses the response."""
+    registration_data = {
+        "client_id": "test-client-id",
+        "client_secret": "test-client-secret",
+        "client_name": "Gateway for example.com",
+        "redirect_uris": ["https://example.com/oauth/callback"],
+        "grant_types": ["authorization_code", "refresh_token"],
+        "response_types": ["code"],
+        "token_endpoint_auth_method": "client_secret_post",
+        "scope": "facts:read facts:make-irrelevant",
+    }
+    mock_http_client.post = AsyncMock(return_value=make_response(registration_data))
+
+    registration = await openid_client.register_client(
+        registration_endpoint="https://example.com/oauth/register",
+        redirect_uris=["https://example.com/oauth/callback"],
+        client_name="Gateway for example.com",
+    )
+
+    assert registration.client_id == "test-client-id"
+    call_kwargs = mock_http_client.post.call_args.kwargs
+    assert call_kwargs["url"] == "https://example.com/oauth/register"
+    assert call_kwargs["headers"]["Content-Type"] == "application/json"
+    body = orjson.loads(call_kwargs["content"])
+    assert body["client_name"] == "Gateway for example.com"
+    assert body["redirect_uris"] == ["https://example.com/oauth/callback"]
+    assert body["grant_types"] == ["authorization_code", "refresh_token"]
+    assert body["response_types"] == ["code"]
+    assert body["token_endpoint_auth_method"] == "client_secret_post"
+    assert body["scope"] == "facts:read facts:make-irrelevant"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "site", ["example.com", "https://example.com", "https://example.com/"]
+)
+async def test_get_openid_config_url(openid_client, mock_http_client, site):
+    """Test that the well-known URL is built the same way for any site form."""
+    await openid_client.get_openid_config(site)
+
+    mock_http_client.get.assert_called_once_with(
+        "https://example.com/.well-known/openprofile.json"
+    )
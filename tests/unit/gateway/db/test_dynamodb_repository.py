@@ -1,9 +1,11 @@
 """Tests for the DynamoDBRepository implementation."""
 
+import asyncio
 import time
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 
 from gateway.db.dynamodb_repository import DynamoDBRepository
 from gateway.exceptions import RepositoryError
@@ -18,22 +20,25 @@ class TestDynamoDBRepository:
         # Mock table resources
         self.mock_dynamodb_table = AsyncMock()
         self.mock_fact_pod_table = AsyncMock()
+        self.mock_state_table = AsyncMock()
         
-        # Mock DynamoDB resource
+        # Mock DynamoDB resource and low-level client
         self.mock_dynamodb_resource = AsyncMock()
+        self.mock_dynamodb_client = AsyncMock()
         
         # Mock aioboto3 session
         self.mock_session = MagicMock()
         
-        # Patch the aioboto3.Session
-        self.session_patcher = patch("aioboto3.Session", return_value=self.mock_session)
-        self.mock_session_class = self.session_patcher.start()
+        # Patch the module-level aioboto3 session
+        self.session_patcher = patch("gateway.db.dynamodb_repository._SESSION", self.mock_session)
+        self.session_patcher.start()
         
         # Setup the repository with test configuration
         self.repository = DynamoDBRepository(
             table_name="test-table", 
             region_name="us-test-1",
-            fact_pod_config_table_name="test-fact-pod-table"
+            fact_pod_config_table_name="test-fact-pod-table",
+            oauth_state_table_name="test-state-table"
         )
         
         # Setup the mock chain for DynamoDB resources
@@ -43,6 +48,8 @@ class TestDynamoDBRepository:
         async def mock_get_table(table_name):
             if table_name == "test-fact-pod-table":
                 return self.mock_fact_pod_table
+            if table_name == "test-state-table":
+                return self.mock_state_table
             return self.mock_dynamodb_table
             
         self.mock_dynamodb_resource.Table = mock_get_table
@@ -50,14 +57,25 @@ class TestDynamoDBRepository:
         # Initialize the tables
         self.repository._tables = {
             "test-table": self.mock_dynamodb_table,
-            "test-fact-pod-table": self.mock_fact_pod_table
+            "test-fact-pod-table": self.mock_fact_pod_table,
+            "test-state-table": self.mock_state_table
         }
+        self.repository._client = self.mock_dynamodb_client
         
         yield
         
         # Stop patches after test
         self.session_patcher.stop()
 
+    def test_default_returns_shared_instance(self):
+        """Test that default() creates the repository once and reuses it."""
+        with patch.object(DynamoDBRepository, '_default', None):
+            first = DynamoDBRepository.default()
+            second = DynamoDBRepository.default()
+
+        assert first is second
+        assert isinstance(first, DynamoDBRepository)
+
     @pytest.mark.asyncio
     async def test_get_table_success(self):
         """Test successful table connection."""
@@ -70,6 +88,52 @@ class TestDynamoDBRepository:
         table = await self.repository._get_table(self.repository.fact_pod_config_table_name)
         assert table == self.mock_fact_pod_table
 
+    @pytest.mark.asyncio
+    async def test_get_table_creates_resource_with_config(self):
+        """Test that the DynamoDB resource is created with the client config."""
+        from gateway.config import settings
+        self.repository._tables = {}
+
+        await self.repository._get_table()
+
+        self.mock_session.resource.assert_called_once()
+        config = self.mock_session.resource.call_args[1]['config']
+        assert config.tcp_keepalive is True
+        assert config.max_pool_connections == settings.db_max_pool_connections
+
+    @pytest.mark.asyncio
+    async def test_get_table_uses_max_pool_connections_override(self):
+        """Test that the connection pool size can be overridden per repository."""
+        repository = DynamoDBRepository(
+            table_name="other-table", region_name="us-test-1", max_pool_connections=256
+        )
+
+        await repository._get_table()
+
+        config = self.mock_session.resource.call_args[1]['config']
+        assert config.max_pool_connections == 256
+
+    @pytest.mark.asyncio
+    async def test_get_table_concurrent_first_calls_share_resource(self):
+        """Test that racing first calls create a single resource."""
+        self.repository._tables = {}
+
+        tables = await asyncio.gather(*(self.repository._get_table() for _ in range(5)))
+
+        assert all(table is self.mock_dynamodb_table for table in tables)
+        self.mock_session.resource.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_repositories_share_module_session(self):
+        """Test that separate repositories connect through the same session."""
+        other = DynamoDBRepository(table_name="other-table", region_name="us-test-1")
+
+        await other._get_table()
+        self.repository._tables = {}
+        await self.repository._get_table()
+
+        assert self.mock_session.resource.call_count == 2
+
     @pytest.mark.asyncio
     async def test_get_table_error(self):
         """Test error handling when connecting to table."""
@@ -85,22 +149,93 @@ class TestDynamoDBRepository:
         
         assert "Failed to connect to DynamoDB" in str(excinfo.value)
 
+    @pytest.mark.asyncio
+    async def test_get_client_creates_client_with_config(self):
+        """Test that the low-level client is created once with the client config."""
+        self.repository._client = None
+        self.mock_session.client.return_value.__aenter__ = AsyncMock(
+            return_value=self.mock_dynamodb_client
+        )
+
+        first = await self.repository._get_client()
+        second = await self.repository._get_client()
+
+        assert first is second is self.mock_dynamodb_client
+        self.mock_session.client.assert_called_once()
+        assert self.mock_session.client.call_args[1]['config'] is not None
+
+    @pytest.mark.asyncio
+    async def test_get_client_error(self):
+        """Test error handling when creating the low-level client."""
+        self.repository._client = None
+        self.mock_session.client.side_effect = Exception("Connection error")
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository._get_client()
+
+        assert "Failed to connect to DynamoDB" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_warmup_connects_tables(self):
+        """Test that warmup connects both tables and primes the connection."""
+        self.repository._tables = {}
+
+        await self.repository.warmup()
+
+        assert self.repository._tables == {
+            "test-table": self.mock_dynamodb_table,
+            "test-fact-pod-table": self.mock_fact_pod_table,
+            "test-state-table": self.mock_state_table,
+        }
+        self.mock_dynamodb_table.get_item.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_warmup_error_is_ignored(self):
+        """Test that a failed warmup does not raise."""
+        self.repository._tables = {}
+        self.mock_session.resource.side_effect = Exception("Connection error")
+
+        await self.repository.warmup()
+
+        assert self.repository._tables == {}
+
     @pytest.mark.asyncio
     async def test_close(self):
         """Test closing the DynamoDB connection."""
-        # Set up the resource
-        self.repository._resource = self.mock_dynamodb_resource
+        # Open the resource and client through the repository
+        self.repository._tables = {}
+        self.repository._client = None
+        await self.repository._get_table()
+        await self.repository._get_client()
         
         await self.repository.close()
-        self.mock_dynamodb_resource.__aexit__.assert_called_once()
+        self.mock_session.resource.return_value.__aexit__.assert_called_once()
+        self.mock_session.client.return_value.__aexit__.assert_called_once()
+        assert self.repository._client is None
         assert self.repository._resource is None
         assert self.repository._tables == {}
 
+    @pytest.mark.asyncio
+    async def test_close_exits_all_contexts_on_error(self):
+        """Test that a failure closing the client still closes the resource."""
+        self.repository._tables = {}
+        self.repository._client = None
+        await self.repository._get_table()
+        await self.repository._get_client()
+        self.mock_session.client.return_value.__aexit__.side_effect = Exception(
+            "Close error"
+        )
+
+        await self.repository.close()
+
+        self.mock_session.resource.return_value.__aexit__.assert_called_once()
+        assert self.repository._resource is None
+
     @pytest.mark.asyncio
     async def test_get_categories_success(self):
         """Test successful retrieval of categories."""
         # Setup mock response
-        self.mock_dynamodb_table.scan.return_value = {
+        self.mock_dynamodb_table.query.return_value = {
             'Items': [
                 {'name': 'Category1', 'item_type': 'category'},
                 {'name': 'Category2', 'item_type': 'category'},
@@ -117,20 +252,19 @@ class TestDynamoDBRepository:
         assert 'Category2' in result
         assert 'Category3' in result
         
-        # Verify the scan was called with the correct parameters
-        self.mock_dynamodb_table.scan.assert_called_once()
-        call_args = self.mock_dynamodb_table.scan.call_args[1]
-        assert 'FilterExpression' in call_args
-        # Instead of comparing object identity, verify the expression works with 'category'
-        filter_expr = call_args['FilterExpression']
-        # Just check that it's a Key expression
-        assert isinstance(filter_expr, Key('item_type').eq('category').__class__)
+        # Verify the query was called with the correct parameters
+        self.mock_dynamodb_table.query.assert_called_once()
+        call_args = self.mock_dynamodb_table.query.call_args[1]
+        assert call_args['IndexName'] == 'item_type-index'
+        assert call_args['KeyConditionExpression'] == Key('item_type').eq('category')
+        assert call_args['ProjectionExpression'] == '#n'
+        assert call_args['ExpressionAttributeNames'] == {'#n': 'name'}
 
     @pytest.mark.asyncio
     async def test_get_categories_pagination(self):
         """Test pagination for category retrieval."""
         # Setup mock responses with pagination
-        self.mock_dynamodb_table.scan.side_effect = [
+        self.mock_dynamodb_table.query.side_effect = [
             {
                 'Items': [
                     {'name': 'Category1', 'item_type': 'category'},
@@ -152,17 +286,17 @@ class TestDynamoDBRepository:
         assert len(result) == 3
         assert result == ['Category1', 'Category2', 'Category3']
         
-        # Verify the scan was called twice with correct parameters
-        assert self.mock_dynamodb_table.scan.call_count == 2
+        # Verify the query was called twice with correct parameters
+        assert self.mock_dynamodb_table.query.call_count == 2
         # Second call should include the ExclusiveStartKey
-        second_call_args = self.mock_dynamodb_table.scan.call_args_list[1][1]
+        second_call_args = self.mock_dynamodb_table.query.call_args_list[1][1]
         assert second_call_args['ExclusiveStartKey'] == {'id': '2'}
 
     @pytest.mark.asyncio
     async def test_get_categories_error(self):
         """Test error handling for category retrieval."""
         # Setup mock to raise an exception
-        self.mock_dynamodb_table.scan.side_effect = Exception("DynamoDB error")
+        self.mock_dynamodb_table.query.side_effect = Exception("DynamoDB error")
         
         # Verify the exception is properly handled
         with pytest.raises(RepositoryError) as excinfo:
@@ -170,33 +304,77 @@ class TestDynamoDBRepository:
         
         assert "Failed to fetch categories" in str(excinfo.value)
 
+    @pytest.mark.asyncio
+    async def test_get_categories_parallel_scan_without_index(self):
+        """Test the segmented scan fallback when no item_type index is set."""
+        self.repository.item_type_index_name = ''
+        self.repository.scan_total_segments = 2
+        pages = {
+            (0, None): {
+                'Items': [{'name': 'Category1'}],
+                'LastEvaluatedKey': {'id': '1'},
+            },
+            (0, '1'): {'Items': [{'name': 'Category2'}]},
+            (1, None): {'Items': [{'name': 'Category3'}]},
+        }
+
+        async def scan(**kwargs):
+            start_key = kwargs.get('ExclusiveStartKey', {}).get('id')
+            return pages[(kwargs['Segment'], start_key)]
+
+        self.mock_dynamodb_table.scan.side_effect = scan
+
+        result = await self.repository.get_categories()
+
+        assert result == ['Category1', 'Category2', 'Category3']
+        assert self.mock_dynamodb_table.scan.call_count == 3
+        self.mock_dynamodb_table.query.assert_not_called()
+        for call in self.mock_dynamodb_table.scan.call_args_list:
+            assert call[1]['TotalSegments'] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_categories_parallel_scan_error(self):
+        """Test error handling for the segmented scan fallback."""
+        self.repository.item_type_index_name = ''
+        self.mock_dynamodb_table.scan.side_effect = Exception("DynamoDB error")
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository.get_categories()
+
+        assert "Failed to fetch categories" in str(excinfo.value)
+
     @pytest.mark.asyncio
     async def test_get_fact_pod_config_found(self):
         """Test successful retrieval of fact pod configuration."""
         # Setup mock response for the fact pod config table
-        mock_item = {
-            'site': 'example.com',
-            'enabled': True,
-            'created_at': '2025-06-25T12:00:00Z',
+        self.mock_dynamodb_client.get_item.return_value = {
+            'Item': {
+                'site': {'S': 'example.com'},
+                'enabled': {'BOOL': True},
+                'created_at': {'S': '2025-06-25T12:00:00Z'},
+            }
         }
-        self.mock_fact_pod_table.get_item.return_value = {'Item': mock_item}
         
         # Call the method
         result = await self.repository.get_fact_pod_config('example.com')
         
-        # Verify results
-        assert result == mock_item
+        # Verify results are deserialized from the wire format
+        assert result == {
+            'site': 'example.com',
+            'enabled': True,
+            'created_at': '2025-06-25T12:00:00Z',
+        }
         
         # Verify the get_item was called with the correct parameters
-        self.mock_fact_pod_table.get_item.assert_called_once_with(
-            Key={'site': 'example.com'}
+        self.mock_dynamodb_client.get_item.assert_called_once_with(
+            TableName='test-fact-pod-table', Key={'site': {'S': 'example.com'}}
         )
 
     @pytest.mark.asyncio
     async def test_get_fact_pod_config_not_found(self):
         """Test retrieval of non-existent fact pod configuration."""
         # Setup mock response for item not found
-        self.mock_fact_pod_table.get_item.return_value = {}
+        self.mock_dynamodb_client.get_item.return_value = {}
         
         # Call the method
         result = await self.repository.get_fact_pod_config('unknown.com')
@@ -205,15 +383,15 @@ class TestDynamoDBRepository:
         assert result is None
         
         # Verify the get_item was called with the correct parameters
-        self.mock_fact_pod_table.get_item.assert_called_once_with(
-            Key={'site': 'unknown.com'}
+        self.mock_dynamodb_client.get_item.assert_called_once_with(
+            TableName='test-fact-pod-table', Key={'site': {'S': 'unknown.com'}}
         )
 
     @pytest.mark.asyncio
     async def test_get_fact_pod_config_error(self):
         """Test error handling for fact pod configuration retrieval."""
         # Setup mock to raise an exception
-        self.mock_fact_pod_table.get_item.side_effect = Exception("DynamoDB error")
+        self.mock_dynamodb_client.get_item.side_effect = Exception("DynamoDB error")
         
         # Verify the exception is properly handled
         with pytest.raises(RepositoryError) as excinfo:
@@ -221,6 +399,19 @@ class TestDynamoDBRepository:
         
         assert "Failed to get fact pod configuration" in str(excinfo.value)
 
+    @pytest.mark.asyncio
+    async def test_get_fact_pod_config_throttling_not_retried_again(self):
+        """Test that throttled reads are left to botocore's own retries."""
+        self.mock_dynamodb_client.get_item.side_effect = ClientError(
+            {'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}},
+            'GetItem',
+        )
+
+        with pytest.raises(RepositoryError):
+            await self.repository.get_fact_pod_config('example.com')
+
+        self.mock_dynamodb_client.get_item.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_store_fact_pod_config_success(self):
         """Test successful storage of fact pod configuration."""
@@ -315,6 +506,57 @@ class TestDynamoDBRepository:
         # Verify results
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_get_user_site_connection_with_fields(self):
+        """Test that requested fields are turned into a projection."""
+        self.mock_dynamodb_table.get_item.return_value = {
+            'Item': {'client_id': 'client123', 'redirect_url': 'https://example.com/cb'}
+        }
+
+        await self.repository.get_user_site_connection(
+            'user123', 'example.com', fields=('client_id', 'redirect_url')
+        )
+
+        self.mock_dynamodb_table.get_item.assert_called_once_with(
+            Key={'pk': 'USER#user123', 'sk': 'SITE#example.com'},
+            ProjectionExpression='#f0, #f1',
+            ExpressionAttributeNames={'#f0': 'client_id', '#f1': 'redirect_url'},
+        )
+
+    @pytest.mark.asyncio
+    async def test_user_site_connection_exists(self):
+        """Test the existence check projects only the partition key."""
+        self.mock_dynamodb_table.get_item.return_value = {
+            'Item': {'pk': 'USER#user123'}
+        }
+
+        result = await self.repository.user_site_connection_exists('user123', 'example.com')
+
+        assert result is True
+        self.mock_dynamodb_table.get_item.assert_called_once_with(
+            Key={'pk': 'USER#user123', 'sk': 'SITE#example.com'},
+            ProjectionExpression='pk',
+        )
+
+    @pytest.mark.asyncio
+    async def test_user_site_connection_exists_not_found(self):
+        """Test the existence check for a missing connection."""
+        self.mock_dynamodb_table.get_item.return_value = {}
+
+        result = await self.repository.user_site_connection_exists('user123', 'unknown.com')
+
+        assert result is False
+
+    @pytest.mark.asyncio
+    async def test_user_site_connection_exists_error(self):
+        """Test error handling for the existence check."""
+        self.mock_dynamodb_table.get_item.side_effect = Exception("DynamoDB error")
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository.user_site_connection_exists('user123', 'example.com')
+
+        assert "Failed to check user-site connection" in str(excinfo.value)
+
     @pytest.mark.asyncio
     async def test_get_user_site_connection_error(self):
         """Test error handling for user-site connection retrieval."""
@@ -374,6 +616,162 @@ class TestDynamoDBRepository:
         
         assert "Failed to store OAuth configuration" in str(excinfo.value)
 
+    @pytest.mark.asyncio
+    async def test_store_oauth_configs_uses_batch_writer(self):
+        """Test that several OAuth configs are written through the batch writer."""
+        mock_batch = MagicMock()
+        mock_batch.put_item = AsyncMock()
+        self.mock_dynamodb_table.batch_writer = MagicMock()
+        self.mock_dynamodb_table.batch_writer.return_value.__aenter__.return_value = (
+            mock_batch
+        )
+        entries = [
+            {
+                'user_id': f'user{i}',
+                'site': 'example.com',
+                'client_id': f'client{i}',
+                'client_secret': f'secret{i}',
+                'redirect_url': 'https://example.com/callback',
+            }
+            for i in range(25)
+        ]
+
+        await self.repository.store_oauth_configs(entries)
+
+        self.mock_dynamodb_table.batch_writer.assert_called_once()
+        assert mock_batch.put_item.call_count == 25
+        item = mock_batch.put_item.call_args_list[24][1]['Item']
+        assert item['pk'] == 'USER#user24'
+        assert item['sk'] == 'SITE#example.com'
+        assert item['client_id'] == 'client24'
+        assert item['item_type'] == 'oauth_config'
+        self.mock_dynamodb_table.put_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_oauth_configs_error(self):
+        """Test error handling for batched OAuth configuration storage."""
+        self.mock_dynamodb_table.batch_writer = MagicMock(
+            side_effect=Exception("DynamoDB error")
+        )
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository.store_oauth_configs(
+                [
+                    {
+                        'user_id': 'user123',
+                        'site': 'example.com',
+                        'client_id': 'client123',
+                        'client_secret': 'secret123',
+                        'redirect_url': 'https://example.com/callback',
+                    }
+                ]
+            )
+
+        assert "Failed to store OAuth configurations" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_store_oauth_config_and_state_success(self):
+        """Test OAuth config and state are written in one transaction."""
+        with patch('time.time', return_value=1625097600):
+            await self.repository.store_oauth_config_and_state(
+                'user123',
+                'example.com',
+                'client123',
+                'secret123',
+                'https://example.com/callback',
+                'state123'
+            )
+
+        self.mock_dynamodb_client.transact_write_items.assert_called_once()
+        transact_items = self.mock_dynamodb_client.transact_write_items.call_args[1]['TransactItems']
+        assert len(transact_items) == 2
+
+        config_put, state_put = transact_items[0]['Put'], transact_items[1]['Put']
+        assert config_put['TableName'] == 'test-table'
+        assert config_put['Item']['pk'] == {'S': 'USER#user123'}
+        assert config_put['Item']['sk'] == {'S': 'SITE#example.com'}
+        assert config_put['Item']['client_id'] == {'S': 'client123'}
+        assert config_put['Item']['item_type'] == {'S': 'oauth_config'}
+
+        from gateway.config import settings
+        assert state_put['TableName'] == 'test-state-table'
+        assert state_put['Item']['state'] == {'S': 'state123'}
+        assert state_put['Item']['user_id'] == {'S': 'user123'}
+        assert state_put['Item']['expires_at'] == {'N': str(1625097600 + settings.oauth_state_ttl_seconds)}
+
+        # Nothing goes through the resource tables
+        self.mock_dynamodb_table.put_item.assert_not_called()
+        self.mock_state_table.put_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_oauth_config_and_state_with_fact_pod_config(self):
+        """Test a new fact pod config joins the transaction and is cached."""
+        config = {'site': 'example.com', 'enabled': True}
+
+        await self.repository.store_oauth_config_and_state(
+            'user123',
+            'example.com',
+            'client123',
+            'secret123',
+            'https://example.com/callback',
+            'state123',
+            fact_pod_config=config
+        )
+
+        transact_items = self.mock_dynamodb_client.transact_write_items.call_args[1]['TransactItems']
+        assert len(transact_items) == 3
+        config_put = transact_items[2]['Put']
+        assert config_put['TableName'] == 'test-fact-pod-table'
+        assert config_put['Item']['site'] == {'S': 'example.com'}
+        assert 'updated_at' in config_put['Item']
+        self.mock_fact_pod_table.put_item.assert_not_called()
+
+        # Later reads are served from the cache
+        result = await self.repository.get_fact_pod_config('example.com')
+        assert result['enabled'] is True
+        self.mock_dynamodb_client.get_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_oauth_config_and_state_error(self):
+        """Test error handling when the OAuth transaction fails."""
+        self.mock_dynamodb_client.transact_write_items.side_effect = Exception("TransactionCanceledException")
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository.store_oauth_config_and_state(
+                'user123',
+                'example.com',
+                'client123',
+                'secret123',
+                'https://example.com/callback',
+                'state123'
+            )
+
+        assert "Failed to store OAuth configuration and state" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_store_oauth_config_and_state_retries_throttled_transaction(self):
+        """Test that a transaction cancelled for throttling is retried."""
+        cancelled = ClientError(
+            {
+                'Error': {'Code': 'TransactionCanceledException', 'Message': 'cancelled'},
+                'CancellationReasons': [{'Code': 'None'}, {'Code': 'ThrottlingError'}],
+            },
+            'TransactWriteItems',
+        )
+        self.mock_dynamodb_client.transact_write_items.side_effect = [cancelled, {}]
+
+        with patch('gateway.db.retry.asyncio.sleep', new=AsyncMock()):
+            await self.repository.store_oauth_config_and_state(
+                'user123',
+                'example.com',
+                'client123',
+                'secret123',
+                'https://example.com/callback',
+                'state123'
+            )
+
+        assert self.mock_dynamodb_client.transact_write_items.await_count == 2
+
     @pytest.mark.asyncio
     async def test_store_oauth_state_success(self):
         """Test successful storage of OAuth state."""
@@ -383,18 +781,16 @@ class TestDynamoDBRepository:
             await self.repository.store_oauth_state('state123', 'user123', 'example.com')
             
             # Verify put_item was called with the correct parameters
-            self.mock_dynamodb_table.put_item.assert_called_once()
-            call_args = self.mock_dynamodb_table.put_item.call_args[1]
+            self.mock_state_table.put_item.assert_called_once()
+            call_args = self.mock_state_table.put_item.call_args[1]
             
             # Check that the item contains all required fields
             item = call_args['Item']
-            assert item['pk'] == 'STATE#state123'
-            assert item['sk'] == 'STATE'
+            assert 'pk' not in item
             assert item['state'] == 'state123'
             assert item['user_id'] == 'user123'
             assert item['site'] == 'example.com'
             assert item['created_at'] == 1625097600
-            assert item['item_type'] == 'oauth_state'
             
             # Check TTL is set correctly based on settings
             from gateway.config import settings
@@ -405,7 +801,7 @@ class TestDynamoDBRepository:
     async def test_store_oauth_state_error(self):
         """Test error handling for OAuth state storage."""
         # Setup mock to raise an exception
-        self.mock_dynamodb_table.put_item.side_effect = Exception("DynamoDB error")
+        self.mock_state_table.put_item.side_effect = Exception("DynamoDB error")
         
         # Verify the exception is properly handled
         with pytest.raises(RepositoryError) as excinfo:
@@ -413,6 +809,40 @@ class TestDynamoDBRepository:
         
         assert "Failed to store OAuth state" in str(excinfo.value)
 
+    @pytest.mark.asyncio
+    async def test_store_oauth_states_uses_batch_writer(self):
+        """Test that several states are written through the batch writer."""
+        mock_batch = MagicMock()
+        mock_batch.put_item = AsyncMock()
+        self.mock_state_table.batch_writer = MagicMock()
+        self.mock_state_table.batch_writer.return_value.__aenter__.return_value = (
+            mock_batch
+        )
+
+        await self.repository.store_oauth_states(
+            [('state1', 'user1', 'a.com'), ('state2', 'user2', 'b.com')]
+        )
+
+        assert mock_batch.put_item.call_count == 2
+        item = mock_batch.put_item.call_args_list[1][1]['Item']
+        assert item['state'] == 'state2'
+        assert item['user_id'] == 'user2'
+        self.mock_state_table.put_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_oauth_states_error(self):
+        """Test error handling for batched OAuth state storage."""
+        self.mock_state_table.batch_writer = MagicMock(
+            side_effect=Exception("DynamoDB error")
+        )
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository.store_oauth_states(
+                [('state1', 'user1', 'a.com'), ('state2', 'user2', 'b.com')]
+            )
+
+        assert "Failed to store OAuth states" in str(excinfo.value)
+
     @pytest.mark.asyncio
     async def test_verify_oauth_state_valid(self):
         """Test verification of valid OAuth state."""
@@ -423,15 +853,11 @@ class TestDynamoDBRepository:
         
         # Setup mock response
         mock_item = {
-            'pk': 'STATE#state123',
-            'sk': 'STATE',
-            'state': 'state123',
-            'user_id': 'user123',
-            'site': 'example.com',
-            'created_at': current_time,
-            'expires_at': expires_at,
+            'user_id': {'S': 'user123'},
+            'site': {'S': 'example.com'},
+            'expires_at': {'N': str(expires_at)},
         }
-        self.mock_dynamodb_table.get_item.return_value = {'Item': mock_item}
+        self.mock_dynamodb_client.get_item.return_value = {'Item': mock_item}
         
         # Mock time.time() to return a fixed value
         with patch('time.time', return_value=current_time):
@@ -444,12 +870,18 @@ class TestDynamoDBRepository:
             assert result['site'] == 'example.com'
             
             # Verify the get_item was called with the correct parameters
-            self.mock_dynamodb_table.get_item.assert_called_once_with(
-                Key={'pk': 'STATE#state123', 'sk': 'STATE'}
+            self.mock_dynamodb_client.get_item.assert_called_once_with(
+                TableName='test-state-table',
+                Key={'state': {'S': 'state123'}},
+                ConsistentRead=True,
+                ProjectionExpression='#u, #s, #e',
+                ExpressionAttributeNames={
+                    '#u': 'user_id', '#s': 'site', '#e': 'expires_at'
+                },
             )
             
             # Delete should not be called for valid state
-            assert not self.mock_dynamodb_table.delete_item.called
+            assert not self.mock_state_table.delete_item.called
 
     @pytest.mark.asyncio
     async def test_verify_oauth_state_expired(self):
@@ -461,15 +893,11 @@ class TestDynamoDBRepository:
         
         # Setup mock response
         mock_item = {
-            'pk': 'STATE#state123',
-            'sk': 'STATE',
-            'state': 'state123',
-            'user_id': 'user123',
-            'site': 'example.com',
-            'created_at': current_time - 660,  # Created 11 minutes ago
-            'expires_at': expires_at,
+            'user_id': {'S': 'user123'},
+            'site': {'S': 'example.com'},
+            'expires_at': {'N': str(expires_at)},
         }
-        self.mock_dynamodb_table.get_item.return_value = {'Item': mock_item}
+        self.mock_dynamodb_client.get_item.return_value = {'Item': mock_item}
         
         # Mock time.time() to return a fixed value
         with patch('time.time', return_value=current_time):
@@ -480,20 +908,24 @@ class TestDynamoDBRepository:
             assert result is None
             
             # Verify the get_item was called with the correct parameters
-            self.mock_dynamodb_table.get_item.assert_called_once_with(
-                Key={'pk': 'STATE#state123', 'sk': 'STATE'}
+            self.mock_dynamodb_client.get_item.assert_called_once_with(
+                TableName='test-state-table',
+                Key={'state': {'S': 'state123'}},
+                ConsistentRead=True,
+                ProjectionExpression='#u, #s, #e',
+                ExpressionAttributeNames={
+                    '#u': 'user_id', '#s': 'site', '#e': 'expires_at'
+                },
             )
             
-            # Verify expired state was deleted
-            self.mock_dynamodb_table.delete_item.assert_called_once_with(
-                Key={'pk': 'STATE#state123', 'sk': 'STATE'}
-            )
+            # Verify expired state is left for DynamoDB TTL to remove
+            self.mock_state_table.delete_item.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_verify_oauth_state_not_found(self):
         """Test verification of non-existent OAuth state."""
         # Setup mock response for item not found
-        self.mock_dynamodb_table.get_item.return_value = {}
+        self.mock_dynamodb_client.get_item.return_value = {}
         
         # Call the method
         result = await self.repository.verify_oauth_state('unknown_state')
@@ -501,22 +933,210 @@ class TestDynamoDBRepository:
         # Verify results
         assert result is None
         
-        # Verify the get_item was called with the correct parameters
-        self.mock_dynamodb_table.get_item.assert_called_once_with(
-            Key={'pk': 'STATE#unknown_state', 'sk': 'STATE'}
-        )
+        # Verify the get_item was called for the state key
+        self.mock_dynamodb_client.get_item.assert_called_once()
+        assert self.mock_dynamodb_client.get_item.call_args[1]['Key'] == {
+            'state': {'S': 'unknown_state'}
+        }
         
         # Delete should not be called for non-existent state
-        assert not self.mock_dynamodb_table.delete_item.called
+        assert not self.mock_state_table.delete_item.called
 
     @pytest.mark.asyncio
     async def test_verify_oauth_state_error(self):
         """Test error handling for OAuth state verification."""
         # Setup mock to raise an exception
-        self.mock_dynamodb_table.get_item.side_effect = Exception("DynamoDB error")
+        self.mock_dynamodb_client.get_item.side_effect = Exception("DynamoDB error")
         
         # Verify the exception is properly handled
         with pytest.raises(RepositoryError) as excinfo:
             await self.repository.verify_oauth_state('state123')
         
         assert "Failed to verify OAuth state" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_get_categories_cached(self):
+        """Test that categories are served from the cache after the first query."""
+        self.mock_dynamodb_table.query.return_value = {
+            'Items': [{'name': 'Category1', 'item_type': 'category'}]
+        }
+
+        first = await self.repository.get_categories()
+        second = await self.repository.get_categories()
+
+        assert first == second == ['Category1']
+        self.mock_dynamodb_table.query.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_categories_cache_expires(self):
+        """Test that categories are queried again once the cache TTL has passed."""
+        from gateway.config import settings
+        self.mock_dynamodb_table.query.return_value = {
+            'Items': [{'name': 'Category1', 'item_type': 'category'}]
+        }
+
+        with patch('time.monotonic', return_value=1000.0):
+            await self.repository.get_categories()
+        with patch(
+            'time.monotonic',
+            return_value=1000.0 + settings.categories_cache_ttl_seconds,
+        ):
+            await self.repository.get_categories()
+
+        assert self.mock_dynamodb_table.query.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_iter_categories_streams_pages(self):
+        """Test that categories are yielded before later pages are read."""
+        self.mock_dynamodb_table.query.side_effect = [
+            {'Items': [{'name': 'Category1'}], 'LastEvaluatedKey': {'id': '1'}},
+            {'Items': [{'name': 'Category2'}]},
+        ]
+
+        stream = self.repository.iter_categories()
+        first = await anext(stream)
+
+        assert first == 'Category1'
+        assert [name async for name in stream] == ['Category2']
+        assert self.mock_dynamodb_table.query.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_categories_prefetches_next_page(self):
+        """Test that the next page is requested while the current one is consumed."""
+        self.mock_dynamodb_table.query.side_effect = [
+            {'Items': [{'name': 'Category1'}], 'LastEvaluatedKey': {'id': '1'}},
+            {'Items': [{'name': 'Category2'}]},
+        ]
+
+        stream = self.repository.iter_categories()
+        await anext(stream)
+        # Let the prefetch run while the caller still holds the first page
+        await asyncio.sleep(0)
+
+        assert self.mock_dynamodb_table.query.call_count == 2
+        second_call_args = self.mock_dynamodb_table.query.call_args_list[1][1]
+        assert second_call_args['ExclusiveStartKey'] == {'id': '1'}
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_iter_categories_completed_stream_fills_cache(self):
+        """Test that a fully consumed stream is served from the cache afterwards."""
+        self.mock_dynamodb_table.query.return_value = {
+            'Items': [{'name': 'Category1'}, {'name': 'Category2'}]
+        }
+
+        streamed = [name async for name in self.repository.iter_categories()]
+        cached = await self.repository.get_categories()
+
+        assert streamed == cached == ['Category1', 'Category2']
+        self.mock_dynamodb_table.query.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_iter_categories_error(self):
+        """Test error handling while streaming categories."""
+        self.mock_dynamodb_table.query.side_effect = Exception("DynamoDB error")
+
+        with pytest.raises(RepositoryError) as excinfo:
+            [name async for name in self.repository.iter_categories()]
+
+        assert "Failed to fetch categories" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_get_fact_pod_config_cached(self):
+        """Test that fact pod configurations are served from the cache."""
+        self.mock_dynamodb_client.get_item.return_value = {
+            'Item': {'site': {'S': 'example.com'}, 'enabled': {'BOOL': True}}
+        }
+
+        first = await self.repository.get_fact_pod_config('example.com')
+        second = await self.repository.get_fact_pod_config('example.com')
+
+        assert first == second == {'site': 'example.com', 'enabled': True}
+        self.mock_dynamodb_client.get_item.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_fact_pod_config_not_found_is_not_cached(self):
+        """Test that missing configurations are looked up again."""
+        self.mock_dynamodb_client.get_item.return_value = {}
+
+        await self.repository.get_fact_pod_config('unknown.com')
+        await self.repository.get_fact_pod_config('unknown.com')
+
+        assert self.mock_dynamodb_client.get_item.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_store_fact_pod_config_writes_through_cache(self):
+        """Test that a stored configuration is served without a read."""
+        config = {'site': 'example.com', 'enabled': True}
+
+        await self.repository.store_fact_pod_config(config)
+        config['enabled'] = False
+        result = await self.repository.get_fact_pod_config('example.com')
+
+        assert result['enabled'] is True
+        self.mock_dynamodb_client.get_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_fact_pod_configs_batches_keys(self):
+        """Test that many sites are fetched in BatchGetItem chunks of 100."""
+        sites = [f'site{i}.com' for i in range(150)]
+
+        async def batch_get_item(RequestItems):
+            keys = RequestItems['test-fact-pod-table']['Keys']
+            return {'Responses': {'test-fact-pod-table': [
+                {'site': key['site'], 'enabled': {'BOOL': True}} for key in keys
+            ]}}
+
+        self.mock_dynamodb_client.batch_get_item.side_effect = batch_get_item
+
+        configs = await self.repository.get_fact_pod_configs(sites)
+
+        assert self.mock_dynamodb_client.batch_get_item.call_count == 2
+        chunk_sizes = sorted(
+            len(call.kwargs['RequestItems']['test-fact-pod-table']['Keys'])
+            for call in self.mock_dynamodb_client.batch_get_item.call_args_list
+        )
+        assert chunk_sizes == [50, 100]
+        assert set(configs) == set(sites)
+        assert configs['site0.com'] == {'site': 'site0.com', 'enabled': True}
+
+    @pytest.mark.asyncio
+    async def test_get_fact_pod_configs_uses_cache_and_retries_unprocessed(self):
+        """Test that cached sites are skipped and unprocessed keys are retried."""
+        self.repository._fact_pod_config_cache.set('cached.com', {'site': 'cached.com'})
+        self.mock_dynamodb_client.batch_get_item.side_effect = [
+            {
+                'Responses': {'test-fact-pod-table': [{'site': {'S': 'a.com'}}]},
+                'UnprocessedKeys': {'test-fact-pod-table': {'Keys': [{'site': {'S': 'b.com'}}]}},
+            },
+            {'Responses': {'test-fact-pod-table': [{'site': {'S': 'b.com'}}]}},
+        ]
+
+        with patch('asyncio.sleep', new=AsyncMock()):
+            configs = await self.repository.get_fact_pod_configs(
+                ['cached.com', 'a.com', 'b.com', 'missing.com']
+            )
+
+        assert configs == {
+            'cached.com': {'site': 'cached.com'},
+            'a.com': {'site': 'a.com'},
+            'b.com': {'site': 'b.com'},
+        }
+        first, second = self.mock_dynamodb_client.batch_get_item.call_args_list
+        assert len(first.kwargs['RequestItems']['test-fact-pod-table']['Keys']) == 3
+        assert second.kwargs['RequestItems'] == {
+            'test-fact-pod-table': {'Keys': [{'site': {'S': 'b.com'}}]}
+        }
+        # Fetched configurations are cached for single-site reads
+        assert await self.repository.get_fact_pod_config('a.com') == {'site': 'a.com'}
+        self.mock_dynamodb_client.get_item.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_fact_pod_configs_error(self):
+        """Test error handling for batched fact pod configuration reads."""
+        self.mock_dynamodb_client.batch_get_item.side_effect = Exception("DynamoDB error")
+
+        with pytest.raises(RepositoryError) as excinfo:
+            await self.repository.get_fact_pod_configs(['example.com'])
+
+        assert "Failed to get fact pod configurations" in str(excinfo.value)
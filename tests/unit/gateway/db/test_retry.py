@@ -0,0 +1,124 @@
+"""Tests for the DynamoDB retry helpers."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from botocore.exceptions import ClientError
+
+from gateway.db.retry import (
+    backoff_delay,
+    is_throttled_transaction,
+    with_backoff,
+)
+
+
+def make_client_error(code):
+    """Build a botocore ClientError with the given error code."""
+    return ClientError({"Error": {"Code": code, "Message": code}}, "PutItem")
+
+
+def make_cancelled_transaction(*reasons):
+    """Build a TransactionCanceledException with the given reason codes."""
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": "cancelled"},
+            "CancellationReasons": [{"Code": reason} for reason in reasons],
+        },
+        "TransactWriteItems",
+    )
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (make_cancelled_transaction("None", "ThrottlingError"), True),
+        (make_cancelled_transaction("ProvisionedThroughputExceeded"), True),
+        (make_cancelled_transaction("None", "ConditionalCheckFailed"), False),
+        (make_client_error("ThrottlingException"), False),
+        (ValueError("boom"), False),
+    ],
+)
+def test_is_throttled_transaction(error, expected):
+    """Test that only transactions cancelled for throttling are retryable."""
+    assert is_throttled_transaction(error) is expected
+
+
+@pytest.mark.asyncio
+async def test_with_backoff_uses_retryable_predicate():
+    """Test that only errors accepted by the predicate are retried."""
+    operation = AsyncMock(
+        side_effect=[make_cancelled_transaction("ThrottlingError"), {}]
+    )
+
+    with patch("gateway.db.retry.asyncio.sleep", new=AsyncMock()):
+        result = await with_backoff(operation, retryable=is_throttled_transaction)
+
+    assert result == {}
+    assert operation.await_count == 2
+
+    operation = AsyncMock(side_effect=make_client_error("ThrottlingException"))
+    with pytest.raises(ClientError):
+        await with_backoff(operation, retryable=is_throttled_transaction)
+    operation.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_with_backoff_retries_throttled_calls():
+    """Test that throttled attempts are retried until one succeeds."""
+    operation = AsyncMock(
+        side_effect=[
+            make_cancelled_transaction("ThrottlingError"),
+            make_cancelled_transaction("None", "ProvisionedThroughputExceeded"),
+            {},
+        ]
+    )
+
+    with patch("gateway.db.retry.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        result = await with_backoff(
+            operation,
+            retryable=is_throttled_transaction,
+            max_attempts=3,
+            base=0.05,
+            cap=2.0,
+        )
+
+    assert result == {}
+    assert operation.await_count == 3
+    assert mock_sleep.await_count == 2
+    for call in mock_sleep.await_args_list:
+        assert 0 <= call.args[0] <= 2.0
+
+
+@pytest.mark.asyncio
+async def test_with_backoff_gives_up_after_max_attempts():
+    """Test that the last throttled cancellation is raised once attempts run out."""
+    operation = AsyncMock(side_effect=make_cancelled_transaction("ThrottlingError"))
+
+    with patch("gateway.db.retry.asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(ClientError):
+            await with_backoff(
+                operation, retryable=is_throttled_transaction, max_attempts=2
+            )
+
+    assert operation.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_with_backoff_does_not_retry_other_errors():
+    """Test that non-throttling errors are raised immediately."""
+    operation = AsyncMock(
+        side_effect=make_cancelled_transaction("ConditionalCheckFailed")
+    )
+
+    with patch("gateway.db.retry.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        with pytest.raises(ClientError):
+            await with_backoff(operation, retryable=is_throttled_transaction)
+
+    operation.assert_awaited_once()
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.parametrize("attempt, bound", [(1, 0.1), (3, 0.4), (10, 2.0)])
+def test_backoff_delay_is_bounded(attempt, bound):
+    """Test that the jittered delay stays within the capped exponential bound."""
+    for _ in range(50):
+        assert 0 <= backoff_delay(attempt) <= bound
@@ -1,7 +1,8 @@
-import json
 import pytest
+from unittest.mock import MagicMock
 from fastmcp import Client
 
+from gateway.db.dynamodb_repository import DynamoDBRepository
 from gateway.handlers.base_handler import BaseHandler
 
 
@@ -28,3 +29,20 @@ async def test_base_handler_registration(base_mcp_server, concrete_handler):
         # Use the structured response directly
         response = result.data
         assert response["message"] == "Hello, World!"
+
+
+def test_base_handler_uses_injected_repository(base_mcp_server):
+    """Test that a provided repository is used instead of the default one."""
+    repository = MagicMock()
+
+    handler = ConcreteHandler(base_mcp_server, repository=repository)
+
+    assert handler.repository is repository
+
+
+def test_base_handler_shares_default_repository(base_mcp_server):
+    """Test that handlers without a repository share the default one."""
+    first = ConcreteHandler(base_mcp_server)
+    second = ConcreteHandler(base_mcp_server)
+
+    assert first.repository is second.repository is DynamoDBRepository.default()
@@ -10,7 +10,7 @@ from gateway.db.repository import Repository
 from gateway.services.fact_pod_service import FactPodOAuthService
 from gateway.clients.openid_client import HttpOpenIDClient
 from gateway.models.auth.oauth import ClientRegistrationResponse
-from gateway.exceptions import GatewayError, HTTPError, FactPodServiceError
+from gateway.exceptions import GatewayError, HTTPError, FactPodServiceError, RepositoryError
 
 
 @pytest.fixture
@@ -20,75 +20,98 @@ def mock_repository():
 
     # Setup the async mock methods
     mock.get_fact_pod_config = AsyncMock(return_value={"enabled": True})
-    mock.get_user_site_connection = AsyncMock(return_value=None)
-    mock.store_oauth_config = AsyncMock()
-    mock.store_oauth_state = AsyncMock()
+    mock.user_site_connection_exists = AsyncMock(return_value=False)
+    mock.store_oauth_config_and_state = AsyncMock()
 
     return mock
 
 
+# Response payloads shared by every test, built and serialized once
+_OPENID_CONFIG = {
+    "issuer": "https://example.com",
+    "authorization_endpoint": "https://example.com/oauth/authorize",
+    "token_endpoint": "https://example.com/oauth/token",
+    "jwks_uri": "https://example.com/oauth/jwks",
+    "registration_endpoint": "https://example.com/oauth/register",
+    "scopes_supported": ["facts:read", "facts:make-irrelevant"],
+    "response_types_supported": ["code"],
+    "grant_types_supported": ["authorization_code", "refresh_token"],
+    "token_endpoint_auth_methods_supported": [
+        "client_secret_basic",
+        "client_secret_post",
+    ],
+    "subject_types_supported": ["public"],
+    "protocol": ["https"],
+}
+_OPENID_CONFIG_CONTENT = json.dumps(_OPENID_CONFIG).encode()
+
+_JWKS = {
+    "keys": [
+        {
+            "kty": "RSA",
+            "use": "sig",
+            "kid": "abc123",
+            "alg": "RS256",
+            "n": "base64url-modulus",
+            "e": "AQAB",
+        }
+    ]
+}
+_JWKS_CONTENT = json.dumps(_JWKS).encode()
+
+_REGISTRATION = ClientRegistrationResponse(
+    client_id="test-client-id",
+    client_secret="test-client-secret",
+    client_id_issued_at=1624553600,
+    client_secret_expires_at=0,
+    client_name="OpenProfile Gateway",
+    redirect_uris=[
+        "https://gateway.openprofile.ai/oauth/callback?site=example.com"
+    ],
+    grant_types=["authorization_code", "refresh_token"],
+    response_types=["code"],
+    token_endpoint_auth_method="client_secret_post",
+    scope="facts:read facts:make-irrelevant"
+)
+_REGISTRATION_DUMP = _REGISTRATION.model_dump()
+_REGISTRATION_CONTENT = _REGISTRATION.model_dump_json().encode()
+
+# Registration the handler's service reports for example.com
+_HANDLER_REGISTRATION = ClientRegistrationResponse(
+    client_id="test-client-id",
+    client_secret="test-client-secret",
+    client_name="Gateway for example.com",
+    redirect_uris=["http://gateway.example.com/callback?site=example.com"],
+    grant_types=["authorization_code", "refresh_token"],
+    response_types=["code"],
+    token_endpoint_auth_method="client_secret_post",
+    scope="facts:read facts:make-irrelevant"
+)
+
+
 @pytest.fixture
 def mock_http_client():
     """Create a mock HTTP client for testing."""
     client = MagicMock(spec=AsyncHTTPClient)
 
     # Mock OpenID configuration response with protocol = ["https"]
-    openid_config_data = {
-        "issuer": "https://example.com",
-        "authorization_endpoint": "https://example.com/oauth/authorize",
-        "token_endpoint": "https://example.com/oauth/token",
-        "jwks_uri": "https://example.com/oauth/jwks",
-        "registration_endpoint": "https://example.com/oauth/register",
-        "scopes_supported": ["facts:read", "facts:make-irrelevant"],
-        "response_types_supported": ["code"],
-        "grant_types_supported": ["authorization_code", "refresh_token"],
-        "token_endpoint_auth_methods_supported": [
-            "client_secret_basic",
-            "client_secret_post",
-        ],
-        "subject_types_supported": ["public"],
-        "protocol": ["https"],
-    }
     mock_openid_response = MagicMock(spec=Response)
     mock_openid_response.status_code = 200
-    mock_openid_response.json.return_value = openid_config_data
+    mock_openid_response.content = _OPENID_CONFIG_CONTENT
+    mock_openid_response.json.return_value = _OPENID_CONFIG
     mock_openid_response.raise_for_status = MagicMock()
 
     # Mock JWKS response
-    jwks_data = {
-        "keys": [
-            {
-                "kty": "RSA",
-                "use": "sig",
-                "kid": "abc123",
-                "alg": "RS256",
-                "n": "base64url-modulus",
-                "e": "AQAB",
-            }
-        ]
-    }
     mock_jwks_response = MagicMock()
     mock_jwks_response.status_code = 200
-    mock_jwks_response.json.return_value = jwks_data
+    mock_jwks_response.content = _JWKS_CONTENT
+    mock_jwks_response.json.return_value = _JWKS
 
     # Mock client registration response
-    client_registration_data = ClientRegistrationResponse(
-        client_id="test-client-id",
-        client_secret="test-client-secret",
-        client_id_issued_at=1624553600,
-        client_secret_expires_at=0,
-        client_name="OpenProfile Gateway",
-        redirect_uris=[
-            "https://gateway.openprofile.ai/oauth/callback?site=example.com"
-        ],
-        grant_types=["authorization_code", "refresh_token"],
-        response_types=["code"],
-        token_endpoint_auth_method="client_secret_post",
-        scope="facts:read facts:make-irrelevant"
-    )
     mock_registration_response = MagicMock(spec=Response)
     mock_registration_response.status_code = 200
-    mock_registration_response.json.return_value = client_registration_data.model_dump()
+    mock_registration_response.content = _REGISTRATION_CONTENT
+    mock_registration_response.json.return_value = _REGISTRATION_DUMP
     mock_registration_response.raise_for_status = MagicMock()
 
     # Setup HTTP client calls
@@ -96,22 +119,6 @@ def mock_http_client():
         mock_openid_response if ".well-known/openprofile.json" in url 
         else mock_jwks_response)
     client.post = AsyncMock(return_value=mock_registration_response)
-    
-    # Patch the openid_client.register_client to return ClientRegistrationResponse
-    # This is critical for fixing the tests
-    original_register_client = HttpOpenIDClient.register_client
-    
-    async def patched_register_client(*args, **kwargs):
-        result = await original_register_client(*args, **kwargs)
-        # If already a ClientRegistrationResponse, return as is
-        if isinstance(result, ClientRegistrationResponse):
-            return result
-        # If dict, convert to ClientRegistrationResponse
-        if isinstance(result, dict):
-            return ClientRegistrationResponse(**result)
-        return result
-        
-    HttpOpenIDClient.register_client = patched_register_client
 
     return client
 
@@ -132,16 +139,9 @@ def enable_fact_pod_handler(base_mcp_server, mock_repository, mock_http_client):
     )
     
     # Patch the service's _register_client method to return a proper ClientRegistrationResponse
-    handler.fact_pod_service._register_client = AsyncMock(return_value=ClientRegistrationResponse(
-        client_id="test-client-id",
-        client_secret="test-client-secret",
-        client_name="Gateway for example.com",
-        redirect_uris=["http://gateway.example.com/callback?site=example.com"],
-        grant_types=["authorization_code", "refresh_token"],
-        response_types=["code"],
-        token_endpoint_auth_method="client_secret_post",
-        scope="facts:read facts:make-irrelevant"
-    ))
+    handler.fact_pod_service._register_client = AsyncMock(
+        return_value=_HANDLER_REGISTRATION
+    )
     
     # Patch the service's _generate_auth_url method
     handler.fact_pod_service._generate_auth_url = AsyncMock(
@@ -309,3 +309,58 @@ async def test_enable_fact_pod_with_existing_config(
 
         # Verify service was called with correct parameters
         enable_fact_pod_handler.fact_pod_service.enable_fact_pod.assert_called_once_with(site, user_id)
+
+
+@pytest.mark.asyncio
+async def test_repository_error_reported_as_database_error(enable_fact_pod_handler):
+    """Test that repository failures map to a database error response."""
+    enable_fact_pod_handler.fact_pod_service.enable_fact_pod = AsyncMock(
+        side_effect=RepositoryError("table unavailable")
+    )
+
+    response = await enable_fact_pod_handler.tool_method("test_user", "example.com")
+
+    assert response == {
+        "status": "error",
+        "message": "Database error: table unavailable",
+        "auth_url": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_gateway_error_already_enabled(enable_fact_pod_handler):
+    """Test that an 'already enabled' gateway error maps to already_enabled."""
+    enable_fact_pod_handler.fact_pod_service.enable_fact_pod = AsyncMock(
+        side_effect=GatewayError("Fact Pod already enabled for user")
+    )
+
+    response = await enable_fact_pod_handler.tool_method("test_user", "example.com")
+
+    assert response["status"] == "already_enabled"
+    assert response["auth_url"] is None
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error(enable_fact_pod_handler):
+    """Test that unknown exceptions produce a generic error response."""
+    enable_fact_pod_handler.fact_pod_service.enable_fact_pod = AsyncMock(
+        side_effect=ValueError("boom")
+    )
+
+    response = await enable_fact_pod_handler.tool_method("test_user", "example.com")
+
+    assert response == {
+        "status": "error",
+        "message": "An unexpected error occurred: boom",
+        "auth_url": None,
+    }
+
+
+def test_handler_uses_shared_http_client_by_default(base_mcp_server):
+    """Test that handlers without an HTTP client share the process-wide one."""
+    first = EnableFactPodHandler(base_mcp_server)
+    second = EnableFactPodHandler(base_mcp_server)
+
+    shared = AsyncHTTPClient.default()
+    assert first.fact_pod_service.openid_client.http_client is shared
+    assert second.fact_pod_service.openid_client.http_client is shared
@@ -1,6 +1,7 @@
+import asyncio
 import time
-import uuid
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, call, patch
 
 from gateway.services.fact_pod_service import FactPodOAuthService, OpenIDConfiguration
@@ -10,6 +11,25 @@ from gateway.models.auth.oauth import ClientRegistrationResponse
 from gateway.exceptions import GatewayError
 
 
+# OpenID configuration of the mocked site, as stored in the database
+_OPENID_CONFIG_DUMP = {
+    "issuer": "https://example.com",
+    "authorization_endpoint": "https://example.com/oauth/authorize",
+    "token_endpoint": "https://example.com/oauth/token",
+    "jwks_uri": "https://example.com/oauth/jwks",
+    "registration_endpoint": "https://example.com/oauth/register",
+    "scopes_supported": ["facts:read"],
+    "response_types_supported": ["code"],
+    "grant_types_supported": ["authorization_code"],
+}
+
+# Registration endpoint response body, shared by every test
+_REGISTER_RESPONSE_STUB = SimpleNamespace(json=lambda: {
+    "client_id": "test_client_id",
+    "client_secret": "test_client_secret"
+})
+
+
 @pytest.fixture
 def mock_repository():
     """Create a mock repository for testing."""
@@ -17,10 +37,9 @@ def mock_repository():
     
     # Setup the async mock methods
     mock.get_fact_pod_config = AsyncMock(return_value=None)
-    mock.get_user_site_connection = AsyncMock(return_value=None)
+    mock.user_site_connection_exists = AsyncMock(return_value=False)
     mock.store_fact_pod_config = AsyncMock()
-    mock.store_oauth_config = AsyncMock()
-    mock.store_oauth_state = AsyncMock()
+    mock.store_oauth_config_and_state = AsyncMock()
     
     return mock
 
@@ -35,34 +54,39 @@ def mock_openid_client():
     mock_config.authorization_endpoint = "https://example.com/oauth/authorize"
     mock_config.registration_endpoint = "https://example.com/oauth/register"
     mock_config.jwks_uri = "https://example.com/oauth/jwks"
-    mock_config.model_dump = MagicMock(return_value={
-        "issuer": "https://example.com",
-        "authorization_endpoint": "https://example.com/oauth/authorize",
-        "token_endpoint": "https://example.com/oauth/token",
-        "jwks_uri": "https://example.com/oauth/jwks",
-        "registration_endpoint": "https://example.com/oauth/register",
-        "scopes_supported": ["facts:read"],
-        "response_types_supported": ["code"],
-        "grant_types_supported": ["authorization_code"],
-    })
+    mock_config.model_dump = MagicMock(return_value=_OPENID_CONFIG_DUMP)
     
     mock.get_openid_config = AsyncMock(return_value=mock_config)
     
     # Mock the HTTP client
     mock_http_client = MagicMock()
     mock_http_client.get = AsyncMock()
-    mock_http_client.post = AsyncMock(return_value=MagicMock(
-        json=MagicMock(return_value={
-            "client_id": "test_client_id",
-            "client_secret": "test_client_secret"
-        })
-    ))
+    mock_http_client.post = AsyncMock(return_value=_REGISTER_RESPONSE_STUB)
     
     mock.http_client = mock_http_client
     
     return mock
 
 
+# Registration the mocked _register_client reports, validated once
+_REGISTRATION = ClientRegistrationResponse(
+    client_id="test_client_id",
+    client_secret="test_client_secret",
+    client_name="Gateway for example.com",
+    redirect_uris=["http://gateway.example.com/callback?site=example.com"],
+    grant_types=["authorization_code", "refresh_token"],
+    response_types=["code"],
+    token_endpoint_auth_method="client_secret_post",
+    scope="facts:read facts:make-irrelevant"
+)
+
+
+def _wire_service(service):
+    """Stub out client registration and auth URL generation on a service."""
+    service._register_client = AsyncMock(return_value=_REGISTRATION)
+    service._generate_auth_url = AsyncMock(return_value="https://example.com/auth?client_id=test")
+
+
 @pytest.fixture
 def fact_pod_service(mock_repository, mock_openid_client):
     """Create a FactPodOAuthService for testing."""
@@ -78,28 +102,14 @@ class TestFactPodOAuthService:
     """Tests for the FactPodOAuthService."""
     
     @pytest.mark.asyncio
-    @patch('uuid.uuid4')
-    async def test_enable_fact_pod_with_new_config(self, mock_uuid, fact_pod_service, mock_repository, mock_openid_client):
+    @patch('secrets.token_urlsafe', return_value="test-state")
+    async def test_enable_fact_pod_with_new_config(self, mock_token, fact_pod_service, mock_repository, mock_openid_client):
         """Test enabling a fact pod with a new configuration."""
-        # Mock UUID generation
-        mock_uuid.return_value = MagicMock(__str__=lambda _: "test-uuid")
-        
         # Set up the mocks
         mock_repository.get_fact_pod_config.return_value = None
         
         # Mock the register client method
-        fact_pod_service._register_client = AsyncMock(return_value=ClientRegistrationResponse(
-            client_id="test_client_id",
-            client_secret="test_client_secret",
-            client_name="Gateway for example.com",
-            redirect_uris=["http://gateway.example.com/callback?site=example.com"],
-            grant_types=["authorization_code", "refresh_token"],
-            response_types=["code"],
-            token_endpoint_auth_method="client_secret_post",
-            scope="facts:read facts:make-irrelevant"
-        ))
-        fact_pod_service._generate_auth_url = AsyncMock(return_value="https://example.com/auth?client_id=test")
-        fact_pod_service._store_oauth_config = AsyncMock()
+        _wire_service(fact_pod_service)
         
         # Enable the fact pod
         result = await fact_pod_service.enable_fact_pod("user123", "example.com")
@@ -111,9 +121,9 @@ class TestFactPodOAuthService:
         # Verify the OpenID configuration was fetched
         mock_openid_client.get_openid_config.assert_called_once_with("example.com")
         
-        # Verify the configuration was stored in the database
-        mock_repository.store_fact_pod_config.assert_called_once()
-        config_arg = mock_repository.store_fact_pod_config.call_args.args[0]
+        # Verify the configuration is stored with the OAuth config and state
+        mock_repository.store_fact_pod_config.assert_not_called()
+        config_arg = mock_repository.store_oauth_config_and_state.call_args.kwargs["fact_pod_config"]
         assert config_arg["site"] == "example.com"
         assert config_arg["enabled"] is True
         assert "openid_config" in config_arg
@@ -123,48 +133,32 @@ class TestFactPodOAuthService:
         # Verify client registration was called
         fact_pod_service._register_client.assert_called_once()
         
-        # Verify OAuth state was stored
-        mock_repository.store_oauth_state.assert_called_once_with(
-            "test-uuid", "user123", "example.com"
+        # Verify OAuth config and state were stored together
+        mock_repository.store_oauth_config_and_state.assert_called_once_with(
+            user_id="user123",
+            site="example.com",
+            client_id="test_client_id",
+            client_secret="test_client_secret",
+            redirect_url="http://gateway.example.com/callback?site=example.com",
+            state="test-state",
+            fact_pod_config=config_arg,
         )
+        mock_token.assert_called_once_with(24)
         
     @pytest.mark.asyncio
-    @patch('uuid.uuid4')
-    async def test_enable_fact_pod_with_existing_config(self, mock_uuid, fact_pod_service, mock_repository, mock_openid_client):
+    @patch('secrets.token_urlsafe', return_value="test-state")
+    async def test_enable_fact_pod_with_existing_config(self, mock_token, fact_pod_service, mock_repository, mock_openid_client):
         """Test enabling a fact pod with an existing configuration."""
-        # Mock UUID generation
-        mock_uuid.return_value = MagicMock(__str__=lambda _: "test-uuid")
-        
         # Set up existing configuration in the mock repository
         existing_config = {
             "site": "example.com",
             "enabled": True,
-            "openid_config": {
-                "issuer": "https://example.com",
-                "authorization_endpoint": "https://example.com/oauth/authorize",
-                "token_endpoint": "https://example.com/oauth/token",
-                "jwks_uri": "https://example.com/oauth/jwks",
-                "registration_endpoint": "https://example.com/oauth/register",
-                "scopes_supported": ["facts:read"],
-                "response_types_supported": ["code"],
-                "grant_types_supported": ["authorization_code"],
-            }
+            "openid_config": _OPENID_CONFIG_DUMP,
         }
         mock_repository.get_fact_pod_config.return_value = existing_config
         
         # Mock the methods
-        fact_pod_service._register_client = AsyncMock(return_value=ClientRegistrationResponse(
-            client_id="test_client_id",
-            client_secret="test_client_secret",
-            client_name="Gateway for example.com",
-            redirect_uris=["http://gateway.example.com/callback?site=example.com"],
-            grant_types=["authorization_code", "refresh_token"],
-            response_types=["code"],
-            token_endpoint_auth_method="client_secret_post",
-            scope="facts:read facts:make-irrelevant"
-        ))
-        fact_pod_service._generate_auth_url = AsyncMock(return_value="https://example.com/auth?client_id=test")
-        fact_pod_service._store_oauth_config = AsyncMock()
+        _wire_service(fact_pod_service)
         
         # Enable the fact pod
         result = await fact_pod_service.enable_fact_pod("user123", "example.com")
@@ -179,22 +173,28 @@ class TestFactPodOAuthService:
         # Verify the configuration was NOT stored in the database again
         mock_repository.store_fact_pod_config.assert_not_called()
         
-        # Verify client registration was still called
+        # Verify client registration was still called, with the stored configuration
         fact_pod_service._register_client.assert_called_once()
-        
-        # Verify OAuth state was stored
-        mock_repository.store_oauth_state.assert_called_once_with(
-            "test-uuid", "user123", "example.com"
+        openid_config = fact_pod_service._register_client.call_args.args[0]
+        assert isinstance(openid_config, OpenIDConfiguration)
+        assert openid_config.registration_endpoint == "https://example.com/oauth/register"
+        
+        # Verify OAuth config and state were stored together
+        mock_repository.store_oauth_config_and_state.assert_called_once_with(
+            user_id="user123",
+            site="example.com",
+            client_id="test_client_id",
+            client_secret="test_client_secret",
+            redirect_url="http://gateway.example.com/callback?site=example.com",
+            state="test-state",
+            fact_pod_config=None,
         )
         
     @pytest.mark.asyncio
     async def test_enable_fact_pod_already_enabled(self, fact_pod_service, mock_repository):
         """Test enabling a fact pod that is already enabled for the user."""
         # Set up the mock to show that user already has connection to the site
-        mock_repository.get_user_site_connection.return_value = {
-            "user_id": "user123", 
-            "site": "example.com"
-        }
+        mock_repository.user_site_connection_exists.return_value = True
         
         # Enable the fact pod (should return already enabled message)
         result = await fact_pod_service.enable_fact_pod("user123", "example.com")
@@ -205,8 +205,37 @@ class TestFactPodOAuthService:
         assert result["auth_url"] is None
         
         # Verify that no further processing was done
-        mock_repository.get_fact_pod_config.assert_not_called()
+        mock_repository.store_oauth_config_and_state.assert_not_called()
+        mock_repository.store_fact_pod_config.assert_not_called()
         
+    @pytest.mark.asyncio
+    async def test_enable_fact_pod_reads_concurrently(self, fact_pod_service, mock_repository):
+        """Test that the connection check and config lookup run concurrently."""
+        both_started = asyncio.Event()
+        started = []
+
+        async def record(name, result):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            # Sequential reads would never see the other call start
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return result
+
+        async def exists(*_):
+            return await record("exists", True)
+
+        async def config(*_):
+            return await record("config", None)
+
+        mock_repository.user_site_connection_exists.side_effect = exists
+        mock_repository.get_fact_pod_config.side_effect = config
+
+        result = await fact_pod_service.enable_fact_pod("user123", "example.com")
+
+        assert result["status"] == "enabled"
+        assert sorted(started) == ["config", "exists"]
+
     @pytest.mark.asyncio
     async def test_enable_fact_pod_no_jwks_call(self, fact_pod_service, mock_repository, mock_openid_client):
         """Test that JWKS URI is not fetched when enabling a fact pod with a new configuration."""
@@ -214,18 +243,7 @@ class TestFactPodOAuthService:
         mock_repository.get_fact_pod_config.return_value = None
         
         # Mock the methods
-        fact_pod_service._register_client = AsyncMock(return_value=ClientRegistrationResponse(
-            client_id="test_client_id",
-            client_secret="test_client_secret",
-            client_name="Gateway for example.com",
-            redirect_uris=["http://gateway.example.com/callback?site=example.com"],
-            grant_types=["authorization_code", "refresh_token"],
-            response_types=["code"],
-            token_endpoint_auth_method="client_secret_post",
-            scope="facts:read facts:make-irrelevant"
-        ))
-        fact_pod_service._generate_auth_url = AsyncMock(return_value="https://example.com/auth?client_id=test")
-        fact_pod_service._store_oauth_config = AsyncMock()
+        _wire_service(fact_pod_service)
         
         # Enable the fact pod
         await fact_pod_service.enable_fact_pod("user123", "example.com")
@@ -237,51 +255,45 @@ class TestFactPodOAuthService:
     async def test_validate_fact_pod_config_already_enabled(self, fact_pod_service, mock_repository):
         """Test validation returns True if fact pod is already enabled for the user."""
         # Set up the mock to return an existing connection
-        mock_repository.get_user_site_connection.return_value = {
-            "user_id": "user123",
-            "site": "example.com"
-        }
+        mock_repository.user_site_connection_exists.return_value = True
         
         # Validate
-        result = await fact_pod_service._validate_fact_pod_config("example.com", "user123")
+        already_enabled, _ = await fact_pod_service._validate_fact_pod_config("example.com", "user123")
         
         # Should return True for already enabled
-        assert result is True
+        assert already_enabled is True
         
     @pytest.mark.asyncio
     async def test_validate_fact_pod_config_not_enabled(self, fact_pod_service, mock_repository):
         """Test validation returns False when fact pod is not already enabled."""
         # Set up the mock to return no existing connection
-        mock_repository.get_user_site_connection.return_value = None
+        mock_repository.user_site_connection_exists.return_value = False
+        
+        mock_repository.get_fact_pod_config.return_value = {"site": "example.com"}
         
         # Validate
-        result = await fact_pod_service._validate_fact_pod_config("example.com", "user123")
+        already_enabled, existing_config = await fact_pod_service._validate_fact_pod_config("example.com", "user123")
         
-        # Should return False since it's not already enabled
-        assert result is False
+        # Should return False since it's not already enabled, plus the stored config
+        assert already_enabled is False
+        assert existing_config == {"site": "example.com"}
         
         # Verify the repository was called with the correct arguments
-        mock_repository.get_user_site_connection.assert_called_once_with("user123", "example.com")
+        mock_repository.user_site_connection_exists.assert_called_once_with("user123", "example.com")
+        mock_repository.get_fact_pod_config.assert_called_once_with("example.com")
 
     @pytest.mark.asyncio
-    async def test_enable_fact_pod_with_existing_config(self, fact_pod_service, mock_repository, mock_openid_client):
-        """Test enabling a fact pod with an existing configuration."""
-        # Set up the mocks
-        mock_repository.get_fact_pod_config.return_value = {
-            "site": "example.com",
-            "enabled": True,
-            "openid_config": {
-                "issuer": "https://example.com",
-                "authorization_endpoint": "https://example.com/oauth/authorize",
-                "token_endpoint": "https://example.com/oauth/token",
-                "registration_endpoint": "https://example.com/oauth/register",
-                "jwks_uri": "https://example.com/oauth/jwks",
-            }
-        }
-        
-        # Mock the methods
-        fact_pod_service._register_client = AsyncMock(return_value=ClientRegistrationResponse(
-            client_id="test_client_id",
+    async def test_generate_auth_url_percent_encodes_parameters(self, fact_pod_service):
+        """Test that the authorization URL query values are percent-encoded."""
+        openid_config = OpenIDConfiguration(
+            issuer="https://example.com",
+            authorization_endpoint="https://example.com/oauth/authorize",
+            token_endpoint="https://example.com/oauth/token",
+            jwks_uri="https://example.com/oauth/jwks",
+            registration_endpoint="https://example.com/oauth/register",
+        )
+        registration = ClientRegistrationResponse(
+            client_id="client id",
             client_secret="test_client_secret",
             client_name="Gateway for example.com",
             redirect_uris=["http://gateway.example.com/callback?site=example.com"],
@@ -289,68 +301,37 @@ class TestFactPodOAuthService:
             response_types=["code"],
             token_endpoint_auth_method="client_secret_post",
             scope="facts:read facts:make-irrelevant"
-        ))
-        fact_pod_service._generate_auth_url = AsyncMock(return_value="https://example.com/auth?client_id=test")
+        )
 
-        # Enable the fact pod
-        result = await fact_pod_service.enable_fact_pod("user123", "example.com")
-        
-        # Verify the result
-        assert result["status"] == "enabled"
-        assert "auth_url" in result
-        
-        # Verify the repository calls
-        mock_repository.store_oauth_config.assert_called_once()
-        mock_repository.store_oauth_state.assert_called_once()
-        mock_repository.store_fact_pod_config.assert_not_called()  # Should not be called for existing config
-        
-    @pytest.mark.asyncio
-    async def test_enable_fact_pod_already_enabled(self, fact_pod_service, mock_repository):
-        """Test enabling a fact pod that is already enabled for the user."""
-        # Set up the mock to return a connection
-        mock_repository.get_user_site_connection.return_value = {
-            "user_id": "user123",
-            "site": "example.com",
-            "enabled": True,
-        }
-        
-        # Enable the fact pod
-        result = await fact_pod_service.enable_fact_pod("user123", "example.com")
-        
-        # Verify the result indicates already enabled
-        assert result["status"] == "enabled"
-        assert "already enabled" in result["message"].lower()
-        assert result["auth_url"] is None
-        
-        # Verify no repository calls were made
-        mock_repository.store_oauth_config.assert_not_called()
-        mock_repository.store_oauth_state.assert_not_called()
-        mock_repository.store_fact_pod_config.assert_not_called()
+        auth_url = await fact_pod_service._generate_auth_url(
+            openid_config,
+            registration,
+            "state&value",
+            "http://gateway.example.com/callback?site=example.com",
+        )
+
+        assert auth_url == (
+            "https://example.com/oauth/authorize"
+            "?response_type=code"
+            "&scope=facts%3Aread%20facts%3Amake-irrelevant"
+            "&client_id=client%20id"
+            "&redirect_uri=http%3A%2F%2Fgateway.example.com%2Fcallback%3Fsite%3Dexample.com"
+            "&state=state%26value"
+        )
 
     @pytest.mark.asyncio
-    async def test_enable_fact_pod_no_jwks_call(self, fact_pod_service, mock_repository, mock_openid_client):
-        """Test that JWKS URI is not fetched when enabling a fact pod with a new configuration."""
-        # Set up the mocks
-        mock_repository.get_fact_pod_config.return_value = None
-        
-        # Mock the methods
-        fact_pod_service._register_client = AsyncMock(return_value=ClientRegistrationResponse(
-            client_id="test_client_id",
-            client_secret="test_client_secret",
-            client_name="Gateway for example.com",
-            redirect_uris=["http://gateway.example.com/callback?site=example.com"],
-            grant_types=["authorization_code", "refresh_token"],
-            response_types=["code"],
-            token_endpoint_auth_method="client_secret_post",
-            scope="facts:read facts:make-irrelevant"
-        ))
-        fact_pod_service._generate_auth_url = AsyncMock(return_value="https://example.com/auth?client_id=test")
-        fact_pod_service._store_oauth_config = AsyncMock()
-        
-        # Enable the fact pod
-        await fact_pod_service.enable_fact_pod("user123", "example.com")
-        
-        # Verify JWKS URI was not called
-        for call_args in mock_openid_client.http_client.get.call_args_list:
-            url = call_args[0][0]
-            assert "jwks" not in url.lower()
+    async def test_enable_many_reports_each_site(self, fact_pod_service):
+        """Test that enabling several sites returns one result per site in order."""
+        async def enable(user_id, site):
+            if site == "broken.com":
+                raise GatewayError("Failed to fetch OpenID configuration")
+            return {"status": "enabled", "message": "ok", "auth_url": f"https://{site}/auth"}
+
+        fact_pod_service.enable_fact_pod = AsyncMock(side_effect=enable)
+
+        results = await fact_pod_service.enable_many("user123", ["a.com", "broken.com", "b.com"])
+
+        assert [result["status"] for result in results] == ["enabled", "error", "enabled"]
+        assert results[0]["auth_url"] == "https://a.com/auth"
+        assert "Failed to fetch OpenID configuration" in results[1]["message"]
+        assert fact_pod_service.enable_fact_pod.call_count == 3
@@ -0,0 +1,122 @@
+"""Tests for the in-process TTL cache."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from gateway.cache import SingleFlight, TTLCache
+
+
+def test_get_returns_cached_value():
+    """Test that stored values are returned until they expire."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert "key" in cache
+
+
+def test_get_missing_returns_default():
+    """Test that a miss returns the provided default."""
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_expired_entries_are_dropped():
+    """Test that entries are removed once their TTL has passed."""
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    with patch("gateway.cache.time.monotonic", return_value=1000.0):
+        cache.set("key", "value")
+    with patch("gateway.cache.time.monotonic", return_value=1059.0):
+        assert cache.get("key") == "value"
+    with patch("gateway.cache.time.monotonic", return_value=1060.0):
+        assert cache.get("key") is None
+
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default():
+    """Test that a per-entry TTL takes precedence over the cache TTL."""
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    with patch("gateway.cache.time.monotonic", return_value=1000.0):
+        cache.set("key", "value", ttl=5)
+    with patch("gateway.cache.time.monotonic", return_value=1005.0):
+        assert cache.get("key") is None
+
+
+def test_zero_ttl_is_not_cached():
+    """Test that a zero TTL skips caching entirely."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value", ttl=0)
+
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the least recently used entry is evicted at capacity."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # Touch "a" so "b" becomes the least recently used entry
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_pop_and_clear():
+    """Test explicit removal of entries."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent calls for one key share a single execution."""
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    tasks = [asyncio.create_task(single_flight.run("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["result"] * 3
+    assert calls == 1
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_runs_again_after_completion():
+    """Test that a new call is made once the previous one has finished."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await single_flight.run("key", work) == 1
+    assert await single_flight.run("key", work) == 2
@@ -1,8 +1,6 @@
 """Tests for the configuration management system."""
 
 import os
-import tempfile
-from pathlib import Path
 from unittest import mock
 import pytest
 import json
@@ -64,30 +62,48 @@ def test_telemetry_settings():
         assert settings.telemetry_endpoint == "http://localhost:4317"
 
 
-def test_env_file_loading():
+def test_env_file_loading(tmp_path):
     """Test loading configuration from .env file."""
-    # Create a temporary directory for our test
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create a temporary .env file
-        env_file_path = Path(temp_dir) / ".env"
-        with open(env_file_path, "w") as env_file:
-            env_file.write("GATEWAY_DB_TABLE_NAME=env_file_table\n")
-            env_file.write("GATEWAY_LOG_LEVEL=DEBUG\n")
-            env_file.write("GATEWAY_SERVER_PORT=9090\n")
-        
-        # Patch the settings to use our temporary directory
-        with mock.patch("gateway.config.GatewaySettings.model_config", {
-                "env_file": str(env_file_path),
-                "env_file_encoding": "utf-8",
-                "env_prefix": "GATEWAY_",
-                "extra": "ignore"
-            }):
-            # Load settings which should read from our temp .env file
-            settings = GatewaySettings()
-            
-            # Verify settings were loaded from .env file
-            assert settings.db_table_name == "env_file_table"
-            assert settings.log_level == "DEBUG"
-            assert settings.server_port == 9090
-            # Values not in .env file should still have defaults
-            assert settings.db_region_name == "us-east-1"
+    # Create a .env file in pytest's temporary directory
+    env_file_path = tmp_path / ".env"
+    env_file_path.write_text(
+        "GATEWAY_DB_TABLE_NAME=env_file_table\n"
+        "GATEWAY_LOG_LEVEL=DEBUG\n"
+        "GATEWAY_SERVER_PORT=9090\n"
+    )
+
+    # Patch the settings to use our temporary .env file
+    with mock.patch("gateway.config.GatewaySettings.model_config", {
+            "env_file": str(env_file_path),
+            "env_file_encoding": "utf-8",
+            "env_prefix": "GATEWAY_",
+            "extra": "ignore"
+        }):
+        # Load settings which should read from our temp .env file
+        settings = GatewaySettings()
+
+        # Verify settings were loaded from .env file
+        assert settings.db_table_name == "env_file_table"
+        assert settings.log_level == "DEBUG"
+        assert settings.server_port == 9090
+        # Values not in .env file should still have defaults
+        assert settings.db_region_name == "us-east-1"
+
+
+def test_cors_allow_origins_is_cached():
+    """Test that the parsed CORS origins are computed once and reused."""
+    with mock.patch.dict(os.environ, {
+        "GATEWAY_CORS_ORIGINS_STR": "http://localhost:3000, https://app.example.com"
+    }):
+        settings = GatewaySettings()
+        origins = settings.cors_allow_origins
+        assert origins == ("http://localhost:3000", "https://app.example.com")
+        assert settings.cors_allow_origins is origins
+
+
+def test_get_settings_is_cached():
+    """Test that get_settings builds the settings once and reuses them."""
+    from gateway import config
+
+    assert config.get_settings() is config.get_settings()
+    assert config.settings is config.get_settings()
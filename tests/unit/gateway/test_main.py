@@ -1,9 +1,10 @@
+import asyncio
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 from fastmcp.server import FastMCP
 
-from gateway.main import create_application
+from gateway.main import build_lifespan, create_application
 
 
 class TestMain(unittest.TestCase):
@@ -22,15 +23,24 @@ class TestMain(unittest.TestCase):
         self, mock_facts, mock_list, mock_disable, mock_enable
     ):
         """Test create_application when an MCP instance is provided."""
+        # Arrange
+        mock_http_client = MagicMock()
+        mock_repository = MagicMock()
+
         # Act
-        result = create_application(self.mock_mcp)
+        result = create_application(
+            self.mock_mcp, http_client=mock_http_client, repository=mock_repository
+        )
 
         # Assert
-        # Verify that all handlers were initialized with the MCP instance
-        mock_enable.assert_called_once_with(self.mock_mcp)
-        mock_disable.assert_called_once_with(self.mock_mcp)
-        mock_list.assert_called_once_with(self.mock_mcp)
-        mock_facts.assert_called_once_with(self.mock_mcp)
+        # Verify that all handlers were initialized with the MCP instance and
+        # share the same repository
+        mock_enable.assert_called_once_with(
+            self.mock_mcp, repository=mock_repository, http_client=mock_http_client
+        )
+        mock_disable.assert_called_once_with(self.mock_mcp, repository=mock_repository)
+        mock_list.assert_called_once_with(self.mock_mcp, repository=mock_repository)
+        mock_facts.assert_called_once_with(self.mock_mcp, repository=mock_repository)
 
         # Verify that the provided MCP instance is returned
         self.assertEqual(result, self.mock_mcp)
@@ -53,17 +63,105 @@ class TestMain(unittest.TestCase):
 
         # Assert
         # Verify FastMCP was created with the default server name
-        mock_fastmcp.assert_called_once_with("OpenProfile.AI")
+        mock_fastmcp.assert_called_once_with("OpenProfile.AI", lifespan=ANY)
 
         # Verify all handlers were initialized with the new MCP instance
-        mock_enable.assert_called_once_with(mock_new_mcp)
-        mock_disable.assert_called_once_with(mock_new_mcp)
-        mock_list.assert_called_once_with(mock_new_mcp)
-        mock_facts.assert_called_once_with(mock_new_mcp)
+        mock_enable.assert_called_once_with(
+            mock_new_mcp, repository=ANY, http_client=ANY
+        )
+        mock_disable.assert_called_once_with(mock_new_mcp, repository=ANY)
+        mock_list.assert_called_once_with(mock_new_mcp, repository=ANY)
+        mock_facts.assert_called_once_with(mock_new_mcp, repository=ANY)
+
+        # Verify a single repository instance is shared by all handlers
+        repositories = {
+            id(mock.call_args.kwargs["repository"])
+            for mock in (mock_enable, mock_disable, mock_list, mock_facts)
+        }
+        self.assertEqual(len(repositories), 1)
 
         # Verify that the new MCP instance is returned
         self.assertEqual(result, mock_new_mcp)
 
+    def test_lifespan_closes_http_client(self):
+        """Test that the application lifespan closes the shared HTTP client."""
+        # Arrange
+        mock_http_client = MagicMock()
+        mock_http_client.aclose = AsyncMock()
+        lifespan = build_lifespan(mock_http_client)
+
+        async def run_lifespan():
+            async with lifespan(self.mock_mcp):
+                mock_http_client.aclose.assert_not_called()
+
+        # Act
+        asyncio.run(run_lifespan())
+
+        # Assert
+        mock_http_client.aclose.assert_awaited_once()
+
+    def test_lifespan_warms_up_and_closes_repository(self):
+        """Test that the application lifespan warms up and closes the repository."""
+        # Arrange
+        mock_http_client = MagicMock()
+        mock_http_client.aclose = AsyncMock()
+        mock_repository = MagicMock()
+        mock_repository.warmup = AsyncMock()
+        mock_repository.close = AsyncMock()
+        lifespan = build_lifespan(mock_http_client, mock_repository)
+
+        async def run_lifespan():
+            async with lifespan(self.mock_mcp):
+                mock_repository.warmup.assert_awaited_once()
+                mock_repository.close.assert_not_called()
+
+        # Act
+        asyncio.run(run_lifespan())
+
+        # Assert
+        mock_repository.close.assert_awaited_once()
+
+    def test_lifespan_closes_repository_when_http_client_close_fails(self):
+        """Test that the repository is closed even if closing the HTTP client fails."""
+        # Arrange
+        mock_http_client = MagicMock()
+        mock_http_client.aclose = AsyncMock(side_effect=RuntimeError("close failed"))
+        mock_repository = MagicMock()
+        mock_repository.warmup = AsyncMock()
+        mock_repository.close = AsyncMock()
+        lifespan = build_lifespan(mock_http_client, mock_repository)
+
+        async def run_lifespan():
+            async with lifespan(self.mock_mcp):
+                pass
+
+        # Act
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run_lifespan())
+
+        # Assert
+        mock_http_client.aclose.assert_awaited_once()
+        mock_repository.close.assert_awaited_once()
+
+    def test_lifespan_warms_up_handlers(self):
+        """Test that the application lifespan runs all handler warmups on startup."""
+        # Arrange
+        mock_http_client = MagicMock()
+        mock_http_client.aclose = AsyncMock()
+        handlers = [MagicMock(warmup=AsyncMock()) for _ in range(3)]
+        lifespan = build_lifespan(mock_http_client, handlers=handlers)
+
+        async def run_lifespan():
+            async with lifespan(self.mock_mcp):
+                for handler in handlers:
+                    handler.warmup.assert_awaited_once()
+
+        # Act
+        asyncio.run(run_lifespan())
+
+        # Assert
+        mock_http_client.aclose.assert_awaited_once()
+
 
 if __name__ == "__main__":
     unittest.main()